@@ -1,6 +1,6 @@
 export default class Enemy extends Phaser.Physics.Arcade.Sprite {
     constructor(scene, x, y) {
-        super(scene, x, y, 'tree');
+        super(scene, x, y, 'sprites', 'tree');
         scene.add.existing(this);
         scene.physics.add.existing(this);
 
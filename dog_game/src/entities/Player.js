@@ -1,6 +1,6 @@
 export default class Player extends Phaser.Physics.Arcade.Sprite {
     constructor(scene, x, y) {
-        super(scene, x, y, 'dog');
+        super(scene, x, y, 'sprites', 'dog');
         scene.add.existing(this);
         scene.physics.add.existing(this);
 
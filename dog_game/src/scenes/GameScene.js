@@ -9,8 +9,8 @@ export default class GameScene extends Phaser.Scene {
 
     preload() {
         const cacheBust = '?v=' + Date.now();
-        this.load.image('dog', 'assets/dog_transparent.png' + cacheBust);
-        this.load.image('tree', 'assets/tree_transparent.png' + cacheBust);
+        // dog and tree frames share one texture (built by hang-glider/build_assets.py)
+        this.load.atlas('sprites', 'assets/atlas.png' + cacheBust, 'assets/atlas.json' + cacheBust);
         this.load.image('tiles', 'assets/tiles.png' + cacheBust);
         this.load.image('bg', 'assets/bg.png' + cacheBust);
     }
@@ -47,7 +47,7 @@ export default class GameScene extends Phaser.Scene {
         // Player
         this.player = new Player(this, 100, 300);
         // Player uses pre-processed transparent texture
-        this.player.setTexture('dog');
+        this.player.setTexture('sprites', 'dog');
 
         // Pass sound manager to player
         this.player.soundManager = this.soundManager;
@@ -186,7 +186,7 @@ export default class GameScene extends Phaser.Scene {
             const x = Phaser.Math.Between(800, width - 200); // Don't spawn in safe zone
             const y = 0; // Drop from sky
             const enemy = new Enemy(this, x, y);
-            enemy.setTexture('tree'); // pre-processed transparent texture
+            enemy.setTexture('sprites', 'tree'); // pre-processed transparent texture
             this.enemies.add(enemy);
         }
     }
@@ -0,0 +1,196 @@
+#!/usr/bin/env python3
+"""
+Sprite atlas packer.
+
+Trims the transparent border of every sprite, packs them into one
+power-of-two texture with a skyline (bottom-left) rectangle packer and writes
+a JSON frame map in the TexturePacker "JSON hash" layout:
+
+    {"frames": {"player": {"frame": {x, y, w, h}, "rotated": false, "trimmed": true,
+                           "spriteSourceSize": {x, y, w, h}, "sourceSize": {w, h}}, ...},
+     "meta": {"image": "atlas.png", "size": {w, h}, ...}}
+
+Phaser loads this directly (this.load.atlas); hang-glider/src/Atlas.js draws
+from it on a plain canvas. spriteSourceSize is the trimmed frame's place in the
+original (optionally downscaled) sprite, so a sprite drawn into the same
+destination rectangle looks the same as before trimming.
+"""
+
+import json
+import os
+
+from PIL import Image
+import numpy as np
+
+from keying import load_rgba, save_rgba, crop_to_content
+
+
+def _scale_for(width, height, max_size):
+    if not max_size or max(width, height) <= max_size:
+        return 1.0
+    return max_size / max(width, height)
+
+
+def _resize(arr, scale):
+    if scale == 1.0:
+        return arr
+    height, width = arr.shape[:2]
+    size = (max(1, round(width * scale)), max(1, round(height * scale)))
+    # PIL premultiplies RGBA for resampling, so transparent colour does not bleed in
+    return np.array(Image.fromarray(arr, 'RGBA').resize(size, Image.LANCZOS))
+
+
+class SkylinePacker:
+    """Bottom-left skyline packing of rectangles into a fixed-size bin."""
+
+    def __init__(self, width, height):
+        self.width = width
+        self.height = height
+        self.skyline = [[0, 0, width]]  # [x, y, segment width]
+
+    def _fit(self, i, w, h):
+        """y where a w x h rectangle fits with its left edge at segment i, or None"""
+        x = self.skyline[i][0]
+        if x + w > self.width:
+            return None
+        y = 0
+        remaining = w
+        while remaining > 0:
+            if i >= len(self.skyline):
+                return None
+            y = max(y, self.skyline[i][1])
+            if y + h > self.height:
+                return None
+            remaining -= self.skyline[i][2]
+            i += 1
+        return y
+
+    def insert(self, w, h):
+        """Place a w x h rectangle; returns (x, y) or None if it does not fit"""
+        best = None
+        for i in range(len(self.skyline)):
+            y = self._fit(i, w, h)
+            if y is not None and (best is None or (y + h, self.skyline[i][0]) < best[0]):
+                best = ((y + h, self.skyline[i][0]), i, y)
+        if best is None:
+            return None
+
+        _, i, y = best
+        x = self.skyline[i][0]
+        self.skyline.insert(i, [x, y + h, w])
+
+        # Cut the segments now covered by the new one
+        j = i + 1
+        while j < len(self.skyline):
+            seg = self.skyline[j]
+            covered = x + w - seg[0]
+            if covered <= 0:
+                break
+            if covered < seg[2]:
+                seg[0] += covered
+                seg[2] -= covered
+                break
+            del self.skyline[j]
+
+        # Merge neighbours at the same height
+        j = 0
+        while j < len(self.skyline) - 1:
+            if self.skyline[j][1] == self.skyline[j + 1][1]:
+                self.skyline[j][2] += self.skyline.pop(j + 1)[2]
+            else:
+                j += 1
+        return x, y
+
+
+def _pow2_sizes(min_area, min_w, min_h, max_size):
+    """Power-of-two (width, height) candidates, smallest area (then squarest) first"""
+    sizes = []
+    w = 1
+    while w <= max_size:
+        h = 1
+        while h <= max_size:
+            if w >= min_w and h >= min_h and w * h >= min_area:
+                sizes.append((w * h, abs(w - h), w, h))
+            h *= 2
+        w *= 2
+    return [(w, h) for _, _, w, h in sorted(sizes)]
+
+
+def pack(sizes, padding=2, max_size=4096):
+    """
+    Positions for rectangles of the given (w, h) sizes in the smallest
+    power-of-two texture. Returns ((width, height), [(x, y), ...]).
+    """
+    padded = [(w + padding, h + padding) for w, h in sizes]
+    # Tallest first, then widest: a stable order gives the same atlas every run
+    order = sorted(range(len(sizes)), key=lambda i: (-padded[i][1], -padded[i][0], i))
+    min_area = sum(w * h for w, h in padded)
+    min_w = max(w for w, h in padded)
+    min_h = max(h for w, h in padded)
+
+    for width, height in _pow2_sizes(min_area, min_w, min_h, max_size):
+        packer = SkylinePacker(width, height)
+        positions = [None] * len(sizes)
+        for i in order:
+            pos = packer.insert(*padded[i])
+            if pos is None:
+                break
+            positions[i] = pos
+        else:
+            return (width, height), positions
+    raise ValueError(f"Sprites do not fit into a {max_size}x{max_size} atlas")
+
+
+def build_atlas(sprites, image_path, data_path, padding=2, max_sprite_size=None, max_size=4096):
+    """
+    sprites: list of (name, path) or (name, path, crop), where crop is the
+    offset record of a sprite that was already cropped by the matte stage
+    ({'x', 'y', 'source_w', 'source_h'}, see build_assets.py); frames are then
+    placed relative to the uncropped sprite. Writes the atlas PNG and its JSON
+    frame map; returns the frame map.
+    """
+    entries = []
+    for sprite in sprites:
+        name, path = sprite[:2]
+        crop = sprite[2] if len(sprite) > 2 else None
+        arr = load_rgba(path)
+        if crop is None:
+            crop = {'x': 0, 'y': 0, 'source_w': arr.shape[1], 'source_h': arr.shape[0]}
+
+        scale = _scale_for(crop['source_w'], crop['source_h'], max_sprite_size)
+        cropped, (x, y) = crop_to_content(_resize(arr, scale))
+        x += round(crop['x'] * scale)
+        y += round(crop['y'] * scale)
+        source_w = max(1, round(crop['source_w'] * scale))
+        source_h = max(1, round(crop['source_h'] * scale))
+        entries.append((name, cropped, x, y, source_w, source_h))
+
+    (width, height), positions = pack([(e[1].shape[1], e[1].shape[0]) for e in entries],
+                                      padding=padding, max_size=max_size)
+
+    atlas = np.zeros((height, width, 4), dtype=np.uint8)
+    frames = {}
+    for (name, cropped, x, y, source_w, source_h), (ax, ay) in zip(entries, positions):
+        h, w = cropped.shape[:2]
+        atlas[ay:ay + h, ax:ax + w] = cropped
+        frames[name] = {
+            'frame': {'x': ax, 'y': ay, 'w': w, 'h': h},
+            'rotated': False,
+            'trimmed': (w, h) != (source_w, source_h),
+            'spriteSourceSize': {'x': x, 'y': y, 'w': w, 'h': h},
+            'sourceSize': {'w': source_w, 'h': source_h},
+        }
+
+    data = {
+        'frames': frames,
+        'meta': {
+            'image': os.path.basename(image_path),
+            'size': {'w': width, 'h': height},
+            'format': 'RGBA8888',
+            'scale': '1',
+        },
+    }
+    save_rgba(atlas, image_path)
+    with open(data_path, 'w', encoding='utf-8') as f:
+        json.dump(data, f, indent=2)
+    return data
@@ -0,0 +1,447 @@
+#!/usr/bin/env python3
+"""
+Accuracy and throughput benchmark for the background removal scripts.
+
+Synthetic sprites of known shape are drawn on green, magenta, white and
+checkerboard backgrounds, so the background mask is known exactly. Every
+implementation runs file to file (PNG decode, keying, PNG encode, as the
+scripts do) on the backgrounds it is meant for, and the report records
+  - throughput   (megapixels/sec, best of N runs)
+  - peak memory  (tracemalloc peak of one run: NumPy and Python allocations)
+  - mask IoU     (removed pixels vs the true background)
+  - mismatches   (pixels removed differently from the original per-pixel loop,
+                  for implementations that replace one)
+
+The reference_* implementations are the original PIL pixel loops the scripts
+started from, kept here to check that faster code removes the same pixels.
+They are skipped above MAX_REFERENCE_PIXELS.
+
+Usage:
+    python benchmark.py                          # everything -> keying_benchmark.json
+    python benchmark.py --impl chroma_key reference_chroma_key --sizes small
+    python benchmark.py --compare old.json       # non-zero exit on a regression
+"""
+
+import argparse
+import json
+import os
+import platform
+import sys
+import tempfile
+import time
+import tracemalloc
+from datetime import datetime, timezone
+
+from PIL import Image
+import numpy as np
+
+from chroma_key import chroma_key_transparency, chroma_key_auto, green_keys, magenta_keys
+from fix_player import remove_green_background
+from fix_player_white import remove_white_background
+from process_transparency import make_transparent, flood_fill_transparency
+from keying import key_file_tiled, key_color_mask, green_mask, white_mask
+
+# name: (width, height)
+FIXTURE_SIZES = {
+    'small': (256, 256),
+    'medium': (1024, 1024),
+    'large': (2048, 2048),
+}
+
+BACKGROUNDS = ['green', 'magenta', 'white', 'checker']
+
+# Checkerboard fixture: cell size and the two shades of a light "transparency" grid
+CHECKER_CELL = 8
+CHECKER_SHADES = (255, 238)
+
+MAX_REFERENCE_PIXELS = 300_000
+
+
+def _background(kind, width, height, rng):
+    bg = np.empty((height, width, 4), dtype=np.uint8)
+    bg[..., 3] = 255
+    if kind == 'green':
+        bg[..., :3] = (0, 255, 0)
+        bg[..., 1] -= rng.integers(0, 12, (height, width), dtype=np.uint8)
+    elif kind == 'magenta':
+        bg[..., :3] = (255, 0, 255)
+        bg[..., 0] -= rng.integers(0, 12, (height, width), dtype=np.uint8)
+        bg[..., 2] -= rng.integers(0, 12, (height, width), dtype=np.uint8)
+    elif kind == 'white':
+        bg[..., :3] = (255 - rng.integers(0, 8, (height, width), dtype=np.uint8))[..., None]
+    elif kind == 'checker':
+        y, x = np.mgrid[:height, :width]
+        cells = (y // CHECKER_CELL + x // CHECKER_CELL) % 2
+        bg[..., :3] = np.where(cells == 0, CHECKER_SHADES[0], CHECKER_SHADES[1]).astype(np.uint8)[..., None]
+    else:
+        raise ValueError(f"Unknown background '{kind}'")
+    return bg
+
+
+def make_fixture(kind, width, height, seed=0):
+    """
+    Synthetic sprite on a `kind` background: (rgba array, true background mask).
+
+    The sprite is a shaded orange body with a 3 px dark gray outline, a blue
+    wing and a near-white highlight, i.e. the colours that trip up the simple
+    keying rules (gray outlines on checkerboards, highlights on white).
+    Edges are hard, so every pixel is either sprite or background.
+    """
+    rng = np.random.default_rng(seed)
+    arr = _background(kind, width, height, rng)
+    y, x = np.mgrid[:height, :width]
+    u = (x - width * 0.5) / (width * 0.32)
+    v = (y - height * 0.55) / (height * 0.28)
+    r = np.sqrt(u * u + v * v)
+
+    body = r < 1.0
+    outline = body & (r >= 1.0 - 3.0 / (min(width, height) * 0.28))
+    wing = (np.abs(y - height * 0.3) < height * 0.04) & (np.abs(x - width * 0.5) < width * 0.45)
+    highlight = (u + 0.35) ** 2 + (v + 0.4) ** 2 < 0.04
+
+    shade = np.clip(1.0 - 0.3 * v, 0.6, 1.0)
+    arr[body, 0] = (225 * shade[body]).astype(np.uint8)
+    arr[body, 1] = (120 * shade[body]).astype(np.uint8)
+    arr[body, 2] = (40 * shade[body]).astype(np.uint8)
+    arr[wing, :3] = (40, 90, 200)
+    arr[outline & ~wing, :3] = (40, 40, 40)
+    arr[highlight & body, :3] = (248, 248, 248)
+    return arr, ~(body | wing)
+
+
+# --- Original per-pixel implementations (as first written in the scripts) ---
+
+def reference_chroma_key(image_path, output_path, key_colors):
+    img = Image.open(image_path).convert('RGBA')
+    pixels = img.load()
+    width, height = img.size
+    for y in range(height):
+        for x in range(width):
+            r, g, b, a = pixels[x, y]
+            for key_r, key_g, key_b, tolerance in key_colors:
+                if abs(r - key_r) < tolerance and abs(g - key_g) < tolerance and abs(b - key_b) < tolerance:
+                    pixels[x, y] = (r, g, b, 0)
+                    break
+    img.save(output_path, 'PNG')
+
+
+def reference_green(image_path, output_path):
+    img = Image.open(image_path).convert('RGBA')
+    pixels = img.load()
+    width, height = img.size
+    for y in range(height):
+        for x in range(width):
+            r, g, b, a = pixels[x, y]
+            if g > 100 and g > r + 30 and g > b + 30:
+                pixels[x, y] = (r, g, b, 0)
+    img.save(output_path, 'PNG')
+
+
+def reference_white(image_path, output_path):
+    img = Image.open(image_path).convert('RGBA')
+    pixels = img.load()
+    width, height = img.size
+    for y in range(height):
+        for x in range(width):
+            r, g, b, a = pixels[x, y]
+            if r > 240 and g > 240 and b > 240:
+                pixels[x, y] = (r, g, b, 0)
+    img.save(output_path, 'PNG')
+
+
+def reference_make_transparent(image_path, output_path):
+    img = Image.open(image_path).convert('RGBA')
+    pixels = img.load()
+    width, height = img.size
+    for y in range(height):
+        for x in range(width):
+            r, g, b, a = pixels[x, y]
+            if abs(r - g) < 10 and abs(g - b) < 10 and abs(r - b) < 10 and a == 255:
+                neighbor_grays = 0
+                for dx, dy in [(-1, 0), (1, 0), (0, -1), (0, 1)]:
+                    nx, ny = x + dx, y + dy
+                    if 0 <= nx < width and 0 <= ny < height:
+                        nr, ng, nb, na = pixels[nx, ny]
+                        if abs(nr - ng) < 10 and abs(ng - nb) < 10:
+                            neighbor_grays += 1
+                if neighbor_grays >= 3:
+                    pixels[x, y] = (r, g, b, 0)
+    img.save(output_path, 'PNG')
+
+
+def reference_flood_fill(image_path, output_path):
+    img = Image.open(image_path).convert('RGBA')
+    pixels = img.load()
+    width, height = img.size
+    for start_x, start_y in [(0, 0), (width - 1, 0), (0, height - 1), (width - 1, height - 1)]:
+        start_color = pixels[start_x, start_y]
+        if start_color[3] == 0:
+            continue
+        stack = [(start_x, start_y)]
+        visited = set()
+        while stack:
+            x, y = stack.pop()
+            if (x, y) in visited or x < 0 or x >= width or y < 0 or y >= height:
+                continue
+            current = pixels[x, y]
+            is_gray = abs(current[0] - current[1]) < 30 and abs(current[1] - current[2]) < 30
+            diff = sum(abs(current[i] - start_color[i]) for i in range(3))
+            if is_gray and diff < 150:
+                visited.add((x, y))
+                pixels[x, y] = (current[0], current[1], current[2], 0)
+                stack.extend([(x + 1, y), (x - 1, y), (x, y + 1), (x, y - 1)])
+    img.save(output_path, 'PNG')
+
+
+class Implementation:
+    """
+    A file-to-file keying function, run(image_path, output_path, background),
+    with the backgrounds it is meant for and, optionally, the reference
+    implementation whose pixels it must reproduce.
+    """
+
+    def __init__(self, name, run, backgrounds, reference=None, max_pixels=None, description=''):
+        self.name = name
+        self.run = run
+        self.backgrounds = backgrounds
+        self.reference = reference
+        self.max_pixels = max_pixels
+        self.description = description
+
+
+KEYS = {'green': green_keys, 'magenta': magenta_keys}
+
+
+def _quiet(func):
+    """Call a script function without its per-file progress line"""
+    def run(*args, **kwargs):
+        stdout = sys.stdout
+        sys.stdout = open(os.devnull, 'w')
+        try:
+            func(*args, **kwargs)
+        finally:
+            sys.stdout.close()
+            sys.stdout = stdout
+    return run
+
+
+IMPLEMENTATIONS = {
+    'chroma_key': Implementation(
+        'chroma_key', lambda i, o, bg: _quiet(chroma_key_transparency)(i, o, KEYS[bg]),
+        ['green', 'magenta'], reference='reference_chroma_key',
+        description='chroma_key.chroma_key_transparency'),
+    'chroma_key_tiled': Implementation(
+        'chroma_key_tiled', lambda i, o, bg: key_file_tiled(i, o, key_color_mask, KEYS[bg], tile_rows=256),
+        ['green', 'magenta'], reference='reference_chroma_key',
+        description='keying.key_file_tiled(key_color_mask, tile_rows=256)'),
+    'chroma_key_auto': Implementation(
+        'chroma_key_auto', lambda i, o, bg: _quiet(chroma_key_auto)(i, o),
+        BACKGROUNDS, description='chroma_key.chroma_key_auto (keys from keying.detect_key_colors)'),
+    'fix_player': Implementation(
+        'fix_player', lambda i, o, bg: _quiet(remove_green_background)(i, o),
+        ['green'], reference='reference_green', description='fix_player.remove_green_background'),
+    'fix_player_tiled': Implementation(
+        'fix_player_tiled', lambda i, o, bg: key_file_tiled(i, o, green_mask, tile_rows=256),
+        ['green'], reference='reference_green', description='keying.key_file_tiled(green_mask, tile_rows=256)'),
+    'fix_player_white': Implementation(
+        'fix_player_white', lambda i, o, bg: _quiet(remove_white_background)(i, o),
+        ['white'], reference='reference_white', description='fix_player_white.remove_white_background'),
+    'fix_player_white_tiled': Implementation(
+        'fix_player_white_tiled', lambda i, o, bg: key_file_tiled(i, o, white_mask, tile_rows=256),
+        ['white'], reference='reference_white', description='keying.key_file_tiled(white_mask, tile_rows=256)'),
+    'make_transparent': Implementation(
+        'make_transparent', lambda i, o, bg: _quiet(make_transparent)(i, o),
+        ['checker', 'white'], reference='reference_make_transparent',
+        description='process_transparency.make_transparent'),
+    'make_transparent_checker': Implementation(
+        'make_transparent_checker', lambda i, o, bg: _quiet(make_transparent)(i, o, checker=True),
+        ['checker'], description='process_transparency.make_transparent(checker=True)'),
+    'flood_fill': Implementation(
+        'flood_fill', lambda i, o, bg: _quiet(flood_fill_transparency)(i, o),
+        ['checker', 'white'], reference='reference_flood_fill',
+        description='process_transparency.flood_fill_transparency'),
+    'reference_chroma_key': Implementation(
+        'reference_chroma_key', lambda i, o, bg: reference_chroma_key(i, o, KEYS[bg]),
+        ['green', 'magenta'], max_pixels=MAX_REFERENCE_PIXELS, description='original pixel loop'),
+    'reference_green': Implementation(
+        'reference_green', lambda i, o, bg: reference_green(i, o),
+        ['green'], max_pixels=MAX_REFERENCE_PIXELS, description='original pixel loop'),
+    'reference_white': Implementation(
+        'reference_white', lambda i, o, bg: reference_white(i, o),
+        ['white'], max_pixels=MAX_REFERENCE_PIXELS, description='original pixel loop'),
+    'reference_make_transparent': Implementation(
+        'reference_make_transparent', lambda i, o, bg: reference_make_transparent(i, o),
+        ['checker', 'white'], max_pixels=MAX_REFERENCE_PIXELS, description='original pixel loop'),
+    'reference_flood_fill': Implementation(
+        'reference_flood_fill', lambda i, o, bg: reference_flood_fill(i, o),
+        ['checker', 'white'], max_pixels=MAX_REFERENCE_PIXELS, description='original pixel loop'),
+}
+
+
+def _removed(path):
+    with Image.open(path) as img:
+        return np.array(img.convert('RGBA'))[..., 3] == 0
+
+
+def iou(mask, truth):
+    union = np.count_nonzero(mask | truth)
+    return np.count_nonzero(mask & truth) / union if union else 1.0
+
+
+def bench_fixture(impl, background, input_path, truth, work_dir, repeat=3):
+    """Time, peak memory and accuracy of one implementation on one fixture file"""
+    height, width = truth.shape
+    pixels = width * height
+    if impl.max_pixels is not None and pixels > impl.max_pixels:
+        return {'pixels': pixels, 'skipped': True}, None
+
+    output_path = os.path.join(work_dir, f'{impl.name}_{background}.png')
+    runs = []
+    for _ in range(repeat):
+        t0 = time.perf_counter()
+        impl.run(input_path, output_path, background)
+        runs.append(time.perf_counter() - t0)
+
+    # Peak memory in a separate run: tracemalloc slows allocation-heavy code down
+    tracemalloc.start()
+    impl.run(input_path, output_path, background)
+    _, peak = tracemalloc.get_traced_memory()
+    tracemalloc.stop()
+
+    removed = _removed(output_path)
+    best = min(runs)
+    return {
+        'pixels': pixels,
+        'seconds': best,
+        'megapixels_per_sec': pixels / best / 1e6 if best > 0 else None,
+        'peak_memory_bytes': peak,
+        'iou': iou(removed, truth),
+        'false_removed': int(np.count_nonzero(removed & ~truth)),
+        'false_kept': int(np.count_nonzero(~removed & truth)),
+    }, removed
+
+
+def run_benchmarks(names=None, sizes=None, repeat=3, progress=True):
+    names = list(names or IMPLEMENTATIONS)
+    sizes = list(sizes or FIXTURE_SIZES)
+    # References first, so the others can be checked against their masks
+    names.sort(key=lambda n: not n.startswith('reference_'))
+
+    report = {
+        'meta': {
+            'timestamp': datetime.now(timezone.utc).isoformat(timespec='seconds'),
+            'python': platform.python_version(),
+            'numpy': np.__version__,
+            'platform': platform.platform(),
+            'machine': platform.machine(),
+            'fixture_sizes': {s: list(FIXTURE_SIZES[s]) for s in sizes},
+        },
+        'results': {},
+    }
+
+    masks = {}
+    with tempfile.TemporaryDirectory() as work_dir:
+        fixtures = {}
+        for size in sizes:
+            for background in BACKGROUNDS:
+                arr, truth = make_fixture(background, *FIXTURE_SIZES[size])
+                path = os.path.join(work_dir, f'fixture_{background}_{size}.png')
+                Image.fromarray(arr, 'RGBA').save(path, 'PNG')
+                fixtures[background, size] = (path, truth)
+
+        for name in names:
+            if progress:
+                print(f"Benchmarking {name} ...")
+            impl = IMPLEMENTATIONS[name]
+            result = {'description': impl.description, 'reference': impl.reference, 'fixtures': {}}
+            for background in impl.backgrounds:
+                per_size = {}
+                for size in sizes:
+                    path, truth = fixtures[background, size]
+                    r, removed = bench_fixture(impl, background, path, truth, work_dir, repeat=repeat)
+                    if removed is not None:
+                        masks[name, background, size] = removed
+                        ref_mask = masks.get((impl.reference, background, size))
+                        if ref_mask is not None:
+                            r['reference_mismatches'] = int(np.count_nonzero(removed != ref_mask))
+                    per_size[size] = r
+                result['fixtures'][background] = per_size
+            report['results'][name] = result
+
+    return report
+
+
+def print_summary(report):
+    sizes = list(report['meta']['fixture_sizes'])
+    print(f"{'Implementation':<26} {'Background':<10} " +
+          " ".join(f"{s + ' MP/s':>12}" for s in sizes) +
+          f" {'peak MB':>9} {'IoU':>8} {'vs ref':>8}")
+    for name, r in report['results'].items():
+        for background, per_size in r['fixtures'].items():
+            ran = [g for g in per_size.values() if not g.get('skipped')]
+            cells = [f"{'skipped':>12}" if g.get('skipped') else f"{g['megapixels_per_sec']:>12.3f}"
+                     for g in per_size.values()]
+            peak = f"{ran[-1]['peak_memory_bytes'] / 1e6:>9.1f}" if ran else f"{'--':>9}"
+            worst = f"{min(g['iou'] for g in ran):>8.4f}" if ran else f"{'--':>8}"
+            mismatches = [g['reference_mismatches'] for g in ran if 'reference_mismatches' in g]
+            vs_ref = f"{max(mismatches):>8d}" if mismatches else f"{'--':>8}"
+            print(f"{name:<26} {background:<10} " + " ".join(cells) + f" {peak} {worst} {vs_ref}")
+
+
+def compare_reports(old, new, tolerance=0.25, iou_tolerance=1e-9):
+    """
+    List regressions of `new` against `old`: lower throughput (by more than
+    `tolerance`, relative), lower IoU, or new mismatches against a reference.
+    """
+    regressions = []
+    for name, r_new in new['results'].items():
+        r_old = old['results'].get(name)
+        if r_old is None:
+            continue
+        for background, per_size in r_new['fixtures'].items():
+            for size, g_new in per_size.items():
+                g_old = r_old['fixtures'].get(background, {}).get(size)
+                if not g_old or g_old.get('skipped') or g_new.get('skipped'):
+                    continue
+                label = f"{name} {background} {size}"
+                if g_new['megapixels_per_sec'] < g_old['megapixels_per_sec'] / (1 + tolerance):
+                    regressions.append(f"{label}: {g_old['megapixels_per_sec']:.3f} -> "
+                                       f"{g_new['megapixels_per_sec']:.3f} MP/s")
+                if g_new['iou'] < g_old['iou'] - iou_tolerance:
+                    regressions.append(f"{label}: IoU {g_old['iou']:.6f} -> {g_new['iou']:.6f}")
+                if g_new.get('reference_mismatches', 0) > g_old.get('reference_mismatches', 0):
+                    regressions.append(f"{label}: {g_new['reference_mismatches']} pixels differ from "
+                                       f"{r_new['reference']}")
+    return regressions
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description=__doc__.split('\n\n')[0].strip())
+    parser.add_argument('-o', '--output', default='keying_benchmark.json')
+    parser.add_argument('--impl', nargs='+', choices=list(IMPLEMENTATIONS), help='implementations to run (default: all)')
+    parser.add_argument('--sizes', nargs='+', choices=list(FIXTURE_SIZES), help='fixture sizes to run (default: all)')
+    parser.add_argument('--repeat', type=int, default=3)
+    parser.add_argument('--compare', metavar='OLD_REPORT', help='fail if slower or less accurate than this report')
+    parser.add_argument('--tolerance', type=float, default=0.25, help='allowed relative slowdown for --compare')
+    args = parser.parse_args(argv)
+
+    report = run_benchmarks(args.impl, args.sizes, repeat=args.repeat)
+    with open(args.output, 'w', encoding='utf-8') as f:
+        json.dump(report, f, indent=2)
+    print_summary(report)
+    print(f"Report saved to {args.output}")
+
+    if args.compare:
+        with open(args.compare, encoding='utf-8') as f:
+            old = json.load(f)
+        regressions = compare_reports(old, report, tolerance=args.tolerance)
+        for line in regressions:
+            print(f"REGRESSION {line}")
+        if regressions:
+            return 1
+        print(f"No regressions against {args.compare}")
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
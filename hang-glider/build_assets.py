@@ -0,0 +1,363 @@
+#!/usr/bin/env python3
+"""
+Build the game assets from a manifest.
+
+    python build_assets.py [assets_manifest.json] [--force] [-j N] [--source-dir DIR]
+
+The manifest lists (source, output, operation, key colours) entries; see
+assets_manifest.json. Sources are read from source_dir and never modified,
+outputs are written to output_dir (both relative to the manifest file unless
+absolute). --source-dir, or else the HANG_GLIDER_SOURCE_DIR environment
+variable, overrides the manifest source_dir; the build stops with an error if
+the directory does not exist. Images are processed in parallel across cores.
+
+Entries with "tile_rows" run a pixelwise operation (chroma_key, green, white)
+in tiled streaming mode (keying.key_file_tiled), for sources too large to
+hold in memory.
+
+chroma_key entries can add "matte": {"feather": 0.5, "despill": true,
+"spill_radius": 2} for soft edges without key-colour fringes (keying.matte),
+and any non-tiled entry can add "crop": true to cut the output to its opaque
+content. The offset of the crop inside the original canvas is recorded in
+output_dir/sprite_offsets.json.
+
+"key_colors": "auto" on a non-tiled chroma_key entry detects the key colours
+from the border of each source image (keying.detect_key_colors, with an
+optional "params": {"detect": {...}} of its arguments) instead of listing them.
+
+An output is skipped when it exists and the hash of its source bytes and its
+parameters matches the one recorded in output_dir/.build_cache.json, so
+touching one sprite rebuilds one image.
+
+After the images, every entry of "atlases" packs its sprites (files in
+output_dir) into one texture plus JSON frame map (see atlas.py); an atlas is
+rebuilt only when one of its sprites or its settings changed.
+
+"optimize": "fast" | "normal" | "max" (top level, or per asset / atlas entry to
+override it; false to turn it off) runs every written PNG through the lossless
+optimizer (pngopt.py) at that effort before it replaces the old output.
+"""
+
+import argparse
+import hashlib
+import json
+import multiprocessing
+import os
+import sys
+
+import numpy as np
+
+from atlas import build_atlas
+from pngopt import EFFORT, optimize_file
+from keying import (load_rgba, save_rgba, apply_mask, key_color_mask, green_mask, white_mask,
+                    gray_neighbour_mask, detect_checker, checker_mask, corner_background_mask,
+                    key_file_tiled, matte, crop_to_content, detect_key_colors)
+
+# Bump when an operation changes its output, to invalidate every cache entry
+BUILD_VERSION = 1
+CACHE_FILE = '.build_cache.json'
+# Crop offsets of sprites written with "crop": true, read by the atlas stage and the games
+OFFSETS_FILE = 'sprite_offsets.json'
+# Overrides the manifest source_dir when --source-dir is not given
+SOURCE_DIR_ENV = 'HANG_GLIDER_SOURCE_DIR'
+
+
+def _checker(arr, params):
+    pattern = detect_checker(arr) if params.get('detect', True) else None
+    if pattern is not None:
+        return checker_mask(arr, pattern, tolerance=params.get('tolerance', 10))
+    return gray_neighbour_mask(arr, tolerance=params.get('tolerance', 10),
+                               min_neighbours=params.get('min_neighbours', 3))
+
+
+def _key_colors(arr, params):
+    if params['key_colors'] == 'auto':
+        return detect_key_colors(arr, **params.get('detect', {}))
+    return params['key_colors']
+
+
+# operation name -> mask function (arr, params)
+OPERATIONS = {
+    'chroma_key': lambda arr, params: key_color_mask(arr, _key_colors(arr, params)),
+    'green': lambda arr, params: green_mask(arr, params.get('min_green', 100), params.get('margin', 30)),
+    'white': lambda arr, params: white_mask(arr, params.get('threshold', 240)),
+    'checker': _checker,
+    'neighbours': lambda arr, params: gray_neighbour_mask(arr, params.get('tolerance', 10),
+                                                          params.get('min_neighbours', 3)),
+    'flood_fill': lambda arr, params: corner_background_mask(arr, params.get('gray_tolerance', 30),
+                                                             params.get('max_diff', 150)),
+}
+
+
+# Pixelwise operations that can also run tiled ("tile_rows" in the manifest entry):
+# operation name -> (mask function, args, kwargs) from params
+TILED_OPERATIONS = {
+    'chroma_key': lambda params: (key_color_mask, (params['key_colors'],), {}),
+    'green': lambda params: (green_mask, (params.get('min_green', 100), params.get('margin', 30)), {}),
+    'white': lambda params: (white_mask, (params.get('threshold', 240),), {}),
+}
+
+
+def _optimize_effort(entry, default, name):
+    effort = entry.get('optimize', default)
+    if effort in (None, False):
+        return None
+    if effort not in EFFORT:
+        raise ValueError(f"Unknown optimize effort '{effort}' for {name}")
+    return effort
+
+
+def load_manifest(path, source_dir=None):
+    """
+    Read the manifest and resolve it into a list of jobs (dicts with absolute
+    'source' and 'output' paths, 'operation' and 'params').
+    """
+    with open(path, encoding='utf-8') as f:
+        manifest = json.load(f)
+    base = os.path.dirname(os.path.abspath(path))
+
+    source_dir = source_dir or os.environ.get(SOURCE_DIR_ENV) or manifest.get('source_dir', '.')
+    src_dir = os.path.join(base, source_dir)
+    if not os.path.isdir(src_dir):
+        raise FileNotFoundError(
+            f"Source directory not found: {src_dir}\n"
+            f"Pass --source-dir or set {SOURCE_DIR_ENV} to the folder with the source images")
+    out_dir = os.path.join(base, manifest.get('output_dir', '.'))
+    key_sets = manifest.get('key_sets', {})
+    optimize = manifest.get('optimize')
+
+    jobs = []
+    for entry in manifest.get('assets', []):
+        operation = entry['operation']
+        if operation not in OPERATIONS:
+            raise ValueError(f"Unknown operation '{operation}' for {entry['output']}")
+
+        params = dict(entry.get('params', {}))
+        key_colors = entry.get('key_colors')
+        if key_colors == 'auto':
+            params['key_colors'] = 'auto'
+        elif isinstance(key_colors, str):
+            key_colors = key_sets[key_colors]
+        if key_colors is not None and key_colors != 'auto':
+            params['key_colors'] = [list(k) for k in key_colors]
+
+        tile_rows = entry.get('tile_rows')
+        if tile_rows is not None and (operation not in TILED_OPERATIONS or key_colors == 'auto'):
+            raise ValueError(f"Operation '{operation}' for {entry['output']} cannot run tiled")
+        matte_params = entry.get('matte')
+        if matte_params is not None and operation != 'chroma_key':
+            raise ValueError(f"'matte' needs a chroma_key operation ({entry['output']})")
+        crop = bool(entry.get('crop', False))
+        if tile_rows is not None and (matte_params is not None or crop):
+            raise ValueError(f"'matte' and 'crop' need the whole image ({entry['output']})")
+
+        job = {
+            'source': os.path.normpath(os.path.join(src_dir, entry['source'])),
+            'output': os.path.normpath(os.path.join(out_dir, entry['output'])),
+            'operation': operation,
+            'params': params,
+            'tile_rows': tile_rows,
+            'matte': matte_params,
+            'crop': crop,
+            'optimize': _optimize_effort(entry, optimize, entry['output']),
+        }
+        if job['source'] == job['output']:
+            raise ValueError(f"{entry['output']}: source and output are the same file")
+        jobs.append(job)
+
+    atlases = []
+    for entry in manifest.get('atlases', []):
+        sprites = []
+        for sprite in entry['sprites']:
+            if isinstance(sprite, str):
+                sprite = {'file': sprite}
+            name = sprite.get('name', os.path.splitext(os.path.basename(sprite['file']))[0])
+            sprites.append((name, os.path.normpath(os.path.join(out_dir, sprite['file']))))
+        atlases.append({
+            'image': os.path.normpath(os.path.join(out_dir, entry['image'])),
+            'data': os.path.normpath(os.path.join(out_dir, entry['data'])),
+            'sprites': sprites,
+            'params': {
+                'padding': entry.get('padding', 2),
+                'max_sprite_size': entry.get('max_sprite_size'),
+                'max_size': entry.get('max_size', 4096),
+            },
+            'optimize': _optimize_effort(entry, optimize, entry['image']),
+        })
+    return jobs, atlases, out_dir
+
+
+def _hash_file(h, path):
+    with open(path, 'rb') as f:
+        for block in iter(lambda: f.read(1 << 20), b''):
+            h.update(block)
+
+
+def job_hash(job):
+    """Hash of the source bytes and everything that shapes the output"""
+    h = hashlib.sha256()
+    _hash_file(h, job['source'])
+    recipe = {'version': BUILD_VERSION, 'operation': job['operation'], 'params': job['params'],
+              'tiled': job['tile_rows'] is not None, 'matte': job['matte'], 'crop': job['crop'],
+              'optimize': job['optimize']}
+    h.update(json.dumps(recipe, sort_keys=True).encode())
+    return h.hexdigest()
+
+
+def run_job(job):
+    """
+    Process one image; returns (output, offset), offset being the crop record
+    for "crop" entries and None otherwise. Runs in a worker process.
+    """
+    # Write next to the target and rename, so an interrupted build never leaves a half-written asset
+    os.makedirs(os.path.dirname(job['output']), exist_ok=True)
+    tmp_path = job['output'] + '.tmp'
+
+    if job['tile_rows'] is not None:
+        mask_func, args, kwargs = TILED_OPERATIONS[job['operation']](job['params'])
+        key_file_tiled(job['source'], tmp_path, mask_func, *args, tile_rows=job['tile_rows'], **kwargs)
+        offset = None
+    else:
+        arr = load_rgba(job['source'])
+        if job['matte'] is not None:
+            matte(arr, _key_colors(arr, job['params']), **job['matte'])
+        else:
+            apply_mask(arr, OPERATIONS[job['operation']](arr, job['params']))
+
+        offset = None
+        if job['crop']:
+            height, width = arr.shape[:2]
+            arr, (x, y) = crop_to_content(arr)
+            offset = {'x': x, 'y': y, 'w': arr.shape[1], 'h': arr.shape[0],
+                      'source_w': width, 'source_h': height}
+        save_rgba(np.ascontiguousarray(arr), tmp_path)
+    if job['optimize'] is not None:
+        optimize_file(tmp_path, effort=job['optimize'])
+    os.replace(tmp_path, job['output'])
+    return job['output'], offset
+
+
+def atlas_hash(atlas, out_dir, offsets):
+    h = hashlib.sha256()
+    for name, path in atlas['sprites']:
+        h.update(name.encode() + b'\0')
+        _hash_file(h, path)
+        h.update(json.dumps(offsets.get(os.path.relpath(path, out_dir)), sort_keys=True).encode())
+    recipe = {'version': BUILD_VERSION, 'params': atlas['params'], 'data': os.path.basename(atlas['data']),
+              'optimize': atlas['optimize']}
+    h.update(json.dumps(recipe, sort_keys=True).encode())
+    return h.hexdigest()
+
+
+def build_atlases(atlases, out_dir, cache, offsets, force=False):
+    """Pack every out-of-date atlas; returns the number built"""
+    built = 0
+    for atlas in atlases:
+        name = os.path.relpath(atlas['image'], out_dir)
+        missing = [path for _, path in atlas['sprites'] if not os.path.exists(path)]
+        if missing:
+            print(f"Atlas {name}: sprite not found: {missing[0]}")
+            continue
+        digest = atlas_hash(atlas, out_dir, offsets)
+        if (not force and cache.get(name) == digest and
+                os.path.exists(atlas['image']) and os.path.exists(atlas['data'])):
+            print(f"Up to date: {name}")
+            continue
+        # Cropped sprites are placed relative to their original canvas
+        sprites = [(name, path, offsets.get(os.path.relpath(path, out_dir)))
+                   for name, path in atlas['sprites']]
+        data = build_atlas(sprites, atlas['image'], atlas['data'], **atlas['params'])
+        if atlas['optimize'] is not None:
+            optimize_file(atlas['image'], effort=atlas['optimize'])
+        cache[name] = digest
+        _save_cache(out_dir, cache)
+        size = data['meta']['size']
+        print(f"Built atlas: {name} ({size['w']}x{size['h']}, {len(atlas['sprites'])} sprites)")
+        built += 1
+    return built
+
+
+def _load_json(path):
+    try:
+        with open(path, encoding='utf-8') as f:
+            return json.load(f)
+    except (OSError, ValueError):
+        return {}
+
+
+def _save_json(path, data, keep_empty=True):
+    if not data and not keep_empty:
+        if os.path.exists(path):
+            os.remove(path)
+        return
+    os.makedirs(os.path.dirname(path), exist_ok=True)
+    with open(path + '.tmp', 'w', encoding='utf-8') as f:
+        json.dump(data, f, indent=2, sort_keys=True)
+    os.replace(path + '.tmp', path)
+
+
+def _load_cache(out_dir):
+    return _load_json(os.path.join(out_dir, CACHE_FILE))
+
+
+def _save_cache(out_dir, cache):
+    _save_json(os.path.join(out_dir, CACHE_FILE), cache)
+
+
+def build(manifest_path, source_dir=None, force=False, processes=None):
+    """Build every out-of-date asset; returns the number of images processed"""
+    jobs, atlases, out_dir = load_manifest(manifest_path, source_dir)
+    cache = _load_cache(out_dir)
+    offsets = _load_json(os.path.join(out_dir, OFFSETS_FILE))
+
+    pending = []
+    for job in jobs:
+        name = os.path.relpath(job['output'], out_dir)
+        if not os.path.exists(job['source']):
+            print(f"Source file not found: {job['source']}")
+            continue
+        job['hash'] = job_hash(job)
+        if not force and cache.get(name) == job['hash'] and os.path.exists(job['output']):
+            print(f"Up to date: {name}")
+            continue
+        pending.append(job)
+
+    if pending:
+        hashes = {job['output']: job['hash'] for job in pending}
+        processes = min(processes or os.cpu_count() or 1, len(pending))
+        with multiprocessing.Pool(processes) as pool:
+            for output, offset in pool.imap_unordered(run_job, pending):
+                name = os.path.relpath(output, out_dir)
+                if offset is not None:
+                    offsets[name] = offset
+                else:
+                    offsets.pop(name, None)
+                _save_json(os.path.join(out_dir, OFFSETS_FILE), offsets, keep_empty=False)
+                cache[name] = hashes[output]
+                # Record progress as we go, so an interrupted build keeps finished images
+                _save_cache(out_dir, cache)
+                print(f"Built: {name}")
+
+    print(f"Done: {len(pending)} built, {len(jobs) - len(pending)} skipped")
+    return len(pending) + build_atlases(atlases, out_dir, cache, offsets, force=force)
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description='Build the game assets from a manifest.')
+    parser.add_argument('manifest', nargs='?',
+                        default=os.path.join(os.path.dirname(os.path.abspath(__file__)), 'assets_manifest.json'))
+    parser.add_argument('--source-dir', help=f'override the manifest source_dir (default: ${SOURCE_DIR_ENV})')
+    parser.add_argument('--force', action='store_true', help='rebuild everything, ignoring the cache')
+    parser.add_argument('-j', '--jobs', type=int, help='worker processes (default: all cores)')
+    args = parser.parse_args(argv)
+
+    try:
+        build(args.manifest, source_dir=args.source_dir, force=args.force, processes=args.jobs)
+    except FileNotFoundError as e:
+        print(e, file=sys.stderr)
+        return 1
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
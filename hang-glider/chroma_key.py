@@ -1,34 +1,27 @@
 #!/usr/bin/env python3
 """
 Script to remove solid color background using chroma key.
+
+    python chroma_key.py                      # the asset list below
+    python chroma_key.py image.png out.png    # key colours detected from the borders
 """
 
-from PIL import Image
 import os
+import sys
+
+from keying import key_file, key_color_mask, load_rgba, detect_key_colors
 
 def chroma_key_transparency(image_path, output_path, key_colors):
     """Remove specified key colors and make them transparent."""
-    img = Image.open(image_path).convert('RGBA')
-    pixels = img.load()
-    width, height = img.size
-    
-    for y in range(height):
-        for x in range(width):
-            r, g, b, a = pixels[x, y]
-            
-            for key_r, key_g, key_b, tolerance in key_colors:
-                if (abs(r - key_r) < tolerance and 
-                    abs(g - key_g) < tolerance and 
-                    abs(b - key_b) < tolerance):
-                    pixels[x, y] = (r, g, b, 0)
-                    break
-    
-    img.save(output_path, 'PNG')
+    key_file(image_path, output_path, key_color_mask, key_colors)
     print(f"Chroma-keyed: {image_path} -> {output_path}")
 
-# Process new images
-brain_dir = '/Users/kshingu/.gemini/antigravity/brain/4712dd7a-8a06-4d17-913e-5cc603223cbe'
-assets_dir = '/Users/kshingu/.gemini/antigravity/playground/retrograde-juno/hang-glider/assets'
+def chroma_key_auto(image_path, output_path, **detect_args):
+    """Chroma key with the background colours detected from the image borders."""
+    key_colors = detect_key_colors(load_rgba(image_path), **detect_args)
+    print(f"Detected key colors: {key_colors}")
+    chroma_key_transparency(image_path, output_path, key_colors)
+    return key_colors
 
 # Green key colors (for player and candy)
 green_keys = [
@@ -46,20 +39,27 @@ magenta_keys = [
     (220, 0, 220, 30),   # Darker magenta
 ]
 
-# Map of source files to output and key colors
-files_to_process = [
-    ('player_new_1768122111312.png', 'player.png', green_keys),
-    ('cutter_new_1768122126450.png', 'obstacle_cutter.png', magenta_keys),
-    ('construction_new_1768122142901.png', 'obstacle_construction.png', magenta_keys),
-    ('candy_new_1768122157244.png', 'item_candy.png', green_keys),
-]
+if __name__ == "__main__" and len(sys.argv) == 3:
+    chroma_key_auto(sys.argv[1], sys.argv[2])
+elif __name__ == "__main__":
+    # Process new images
+    brain_dir = '/Users/kshingu/.gemini/antigravity/brain/4712dd7a-8a06-4d17-913e-5cc603223cbe'
+    assets_dir = '/Users/kshingu/.gemini/antigravity/playground/retrograde-juno/hang-glider/assets'
+
+    # Map of source files to output and key colors
+    files_to_process = [
+        ('player_new_1768122111312.png', 'player.png', green_keys),
+        ('cutter_new_1768122126450.png', 'obstacle_cutter.png', magenta_keys),
+        ('construction_new_1768122142901.png', 'obstacle_construction.png', magenta_keys),
+        ('candy_new_1768122157244.png', 'item_candy.png', green_keys),
+    ]
 
-for src_file, dst_file, keys in files_to_process:
-    src_path = os.path.join(brain_dir, src_file)
-    dst_path = os.path.join(assets_dir, dst_file)
-    if os.path.exists(src_path):
-        chroma_key_transparency(src_path, dst_path, keys)
-    else:
-        print(f"Source file not found: {src_path}")
+    for src_file, dst_file, keys in files_to_process:
+        src_path = os.path.join(brain_dir, src_file)
+        dst_path = os.path.join(assets_dir, dst_file)
+        if os.path.exists(src_path):
+            chroma_key_transparency(src_path, dst_path, keys)
+        else:
+            print(f"Source file not found: {src_path}")
 
-print("Done processing all images!")
+    print("Done processing all images!")
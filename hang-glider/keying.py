@@ -0,0 +1,486 @@
+#!/usr/bin/env python3
+"""
+Array-based keying engine for the transparency scripts.
+
+The image is converted to a NumPy RGBA buffer (height, width, 4) once; every
+colour test is evaluated as a boolean mask over the whole buffer and the
+matching pixels get alpha 0 (RGB is left unchanged, as in the old loops).
+
+Key colours use the same (r, g, b, tolerance) tuples as chroma_key.py: a pixel
+matches when |channel - key| < tolerance for all three channels.
+"""
+
+from functools import reduce
+
+from PIL import Image
+import numpy as np
+
+from pngstream import PngBandWriter, image_size, iter_rgba_bands
+
+
+def load_rgba(image_path):
+    """Open an image as a (height, width, 4) uint8 array"""
+    with Image.open(image_path) as img:
+        return np.array(img.convert('RGBA'))
+
+
+def save_rgba(arr, output_path):
+    Image.fromarray(arr, 'RGBA').save(output_path, 'PNG')
+
+
+def _channels(arr):
+    # int16 so that differences and sums like g - r or r + 30 cannot wrap around
+    rgb = arr[..., :3].astype(np.int16)
+    return rgb[..., 0], rgb[..., 1], rgb[..., 2]
+
+
+def _key_luts(key_colors):
+    """
+    Per-channel lookup tables: bit k of lut[c][v] is set when channel value v is
+    within tolerance of key colour k on channel c (up to 64 keys per table set).
+    """
+    dtype = np.uint8 if len(key_colors) <= 8 else np.uint64
+    values = np.arange(256, dtype=np.int16)
+    luts = np.zeros((3, 256), dtype=dtype)
+    for k, (key_r, key_g, key_b, tolerance) in enumerate(key_colors):
+        bit = dtype(1) << dtype(k)
+        for c, key in enumerate((key_r, key_g, key_b)):
+            luts[c][np.abs(values - key) < tolerance] |= bit
+    return luts
+
+
+def key_color_mask(arr, key_colors):
+    """
+    Pixels within tolerance of any of the (r, g, b, tolerance) key colours.
+    One table lookup per channel, so the cost does not grow with the number of keys.
+    """
+    key_colors = list(key_colors)
+    mask = np.zeros(arr.shape[:2], dtype=bool)
+    for start in range(0, len(key_colors), 64):
+        lut_r, lut_g, lut_b = _key_luts(key_colors[start:start + 64])
+        hits = lut_r[arr[..., 0]]
+        hits &= lut_g[arr[..., 1]]
+        hits &= lut_b[arr[..., 2]]
+        mask |= hits != 0
+    return mask
+
+
+def green_mask(arr, min_green=100, margin=30):
+    """Green-ish pixels: high G that beats both R and B by margin"""
+    r, g, b = _channels(arr)
+    return (g > min_green) & (g > r + margin) & (g > b + margin)
+
+
+def white_mask(arr, threshold=240):
+    """White / near-white pixels: all channels above threshold"""
+    return (arr[..., 0] > threshold) & (arr[..., 1] > threshold) & (arr[..., 2] > threshold)
+
+
+def apply_mask(arr, mask):
+    """Make the masked pixels transparent (in place) and return arr"""
+    arr[..., 3][mask] = 0
+    return arr
+
+
+def chroma_key(arr, key_colors):
+    return apply_mask(arr, key_color_mask(arr, key_colors))
+
+
+def key_file(image_path, output_path, mask_func, *args, **kwargs):
+    """Load, apply mask_func(arr, *args, **kwargs) and save as PNG"""
+    arr = load_rgba(image_path)
+    apply_mask(arr, mask_func(arr, *args, **kwargs))
+    save_rgba(arr, output_path)
+    return arr
+
+
+# Pixelwise masks: a pixel's result depends on that pixel only, so they can run on tiles
+TILEABLE = (key_color_mask, green_mask, white_mask)
+
+
+def key_file_tiled(image_path, output_path, mask_func, *args, tile_rows=256, **kwargs):
+    """
+    key_file for large images: read, mask and write bands of tile_rows rows
+    (see pngstream), so peak memory follows the tile size. tile_rows=None
+    processes the whole image as one band through the same encoder; the output
+    bytes are the same for any tile size. The pixels are the same as key_file's,
+    but not the bytes: key_file saves through PIL, which filters and deflates
+    differently.
+    """
+    if mask_func not in TILEABLE:
+        raise ValueError(f"{mask_func.__name__} needs the whole image and cannot run tiled")
+    width, height = image_size(image_path)
+    rows = tile_rows or height
+    with PngBandWriter(output_path, width, height) as writer:
+        for band in iter_rgba_bands(image_path, rows):
+            band = np.array(band)
+            apply_mask(band, mask_func(band, *args, **kwargs))
+            writer.write_band(band)
+
+
+def _row_runs(row):
+    """Start and end (exclusive) columns of the True runs in a boolean row"""
+    edges = np.flatnonzero(np.diff(np.concatenate(([False], row, [False])).view(np.int8)))
+    return edges[0::2], edges[1::2]
+
+
+def flood_fill_mask(accept, seeds):
+    """
+    4-connected region of `accept` reachable from the (x, y) seeds.
+
+    Scanline fill over runs: a row's accepted pixels are split into runs once,
+    each run is filled whole and only the runs of the rows above and below that
+    overlap it are queued. Memory is the output bitmap plus one small run list
+    per row touched, regardless of how large the region is.
+    """
+    height, width = accept.shape
+    filled = np.zeros((height, width), dtype=bool)
+    runs = [None] * height  # (starts, ends, done) per row, built on first visit
+
+    def row_runs(y):
+        if runs[y] is None:
+            starts, ends = _row_runs(accept[y])
+            runs[y] = (starts, ends, np.zeros(len(starts), dtype=bool))
+        return runs[y]
+
+    stack = []
+    for x, y in seeds:
+        if 0 <= x < width and 0 <= y < height and accept[y, x]:
+            starts, ends, done = row_runs(y)
+            stack.append((y, int(np.searchsorted(ends, x, side='right'))))
+
+    while stack:
+        y, i = stack.pop()
+        starts, ends, done = runs[y]
+        if done[i]:
+            continue
+        done[i] = True
+        s, e = starts[i], ends[i]
+        filled[y, s:e] = True
+        for ny in (y - 1, y + 1):
+            if 0 <= ny < height:
+                n_starts, n_ends, n_done = row_runs(ny)
+                # Runs of the neighbour row that overlap columns [s, e)
+                lo = np.searchsorted(n_ends, s, side='right')
+                hi = np.searchsorted(n_starts, e, side='left')
+                stack.extend((ny, j) for j in range(lo, hi) if not n_done[j])
+    return filled
+
+
+def corner_background_mask(arr, gray_tolerance=30, max_diff=150):
+    """
+    Background reachable from the four corners, the flood_fill_transparency rule:
+    a pixel joins a corner's region when it is gray (|R-G| and |G-B| below
+    gray_tolerance) and its summed RGB difference from the corner colour is
+    below max_diff. Corners that are already transparent (including ones
+    cleared by an earlier corner) start no fill.
+    """
+    height, width = arr.shape[:2]
+    r, g, b = _channels(arr)
+    gray = (np.abs(r - g) < gray_tolerance) & (np.abs(g - b) < gray_tolerance)
+    background = np.zeros((height, width), dtype=bool)
+
+    for x, y in [(0, 0), (width - 1, 0), (0, height - 1), (width - 1, height - 1)]:
+        if arr[y, x, 3] == 0 or background[y, x]:
+            continue
+        start_r, start_g, start_b = (int(v) for v in arr[y, x, :3])
+        accept = gray & (np.abs(r - start_r) + np.abs(g - start_g) + np.abs(b - start_b) < max_diff)
+        background |= flood_fill_mask(accept, [(x, y)])
+    return background
+
+
+def _gray(arr, tolerance, check_rb=True):
+    r, g, b = _channels(arr)
+    gray = (np.abs(r - g) < tolerance) & (np.abs(g - b) < tolerance)
+    if check_rb:
+        gray &= np.abs(r - b) < tolerance
+    return gray
+
+
+def count_neighbours(mask):
+    """Number of 4-neighbours (inside the image) where mask is True, as uint8"""
+    counts = np.zeros(mask.shape, dtype=np.uint8)
+    counts[1:, :] += mask[:-1, :]
+    counts[:-1, :] += mask[1:, :]
+    counts[:, 1:] += mask[:, :-1]
+    counts[:, :-1] += mask[:, 1:]
+    return counts
+
+
+def gray_neighbour_mask(arr, tolerance=10, min_neighbours=3):
+    """
+    The make_transparent rule: opaque gray pixels (all channel pairs within
+    tolerance) with at least min_neighbours gray 4-neighbours (R-G, G-B test).
+    """
+    candidates = _gray(arr, tolerance) & (arr[..., 3] == 255)
+    return candidates & (count_neighbours(_gray(arr, tolerance, check_rb=False)) >= min_neighbours)
+
+
+def _axis_period(shade, valid, max_period):
+    """
+    Checker cell size and phase along axis 1 of the 2-D arrays (or None).
+    With cell size p the light/dark pattern disagrees with itself shifted by p
+    and agrees when shifted by 2p.
+    """
+    best = None
+    for p in range(2, min(max_period, shade.shape[1] // 2 - 1) + 1):
+        scores = []
+        for s in (p, 2 * p):
+            both = valid[:, s:] & valid[:, :-s]
+            if both.sum() < 4 * p:
+                break
+            scores.append(np.mean((shade[:, s:] == shade[:, :-s])[both]))
+        if len(scores) < 2:
+            continue
+        score = scores[0] + (1.0 - scores[1])
+        if best is None or score < best[0]:
+            best = (score, p)
+    if best is None or best[0] > 0.2:
+        return None
+
+    p = best[1]
+    edges = (shade[:, 1:] != shade[:, :-1]) & valid[:, 1:] & valid[:, :-1]
+    columns = np.nonzero(edges)[1] + 1
+    return p, int(np.bincount(columns % p, minlength=p).argmax())
+
+
+def detect_checker(arr, max_period=32, band=64, tolerance=10):
+    """
+    Find a two-shade gray checkerboard background from the image borders.
+
+    Returns None or a dict with the cell size 'period' (px), 'phase' (x0, y0)
+    of a cell corner and 'shades' (shade of cells with even, odd
+    ((x - x0) // period + (y - y0) // period)).
+    """
+    height, width = arr.shape[:2]
+    band = min(band, height // 2, width // 2)
+    if band < 4:
+        return None
+
+    gray = _gray(arr, tolerance) & (arr[..., 3] == 255)
+    level = arr[..., 0].astype(np.int16)
+
+    # Top and bottom bands give the period and x phase, left and right bands the y phase
+    rows = np.concatenate([level[:band], level[-band:]])
+    rows_valid = np.concatenate([gray[:band], gray[-band:]])
+    if rows_valid.sum() < 16:
+        return None
+    lo, hi = np.percentile(rows[rows_valid], [10, 90])
+    if hi - lo < 8:
+        return None
+    threshold = (lo + hi) / 2
+
+    found = _axis_period(rows > threshold, rows_valid, max_period)
+    if found is None:
+        return None
+    period, x0 = found
+
+    cols = np.concatenate([level[:, :band], level[:, -band:]], axis=1).T
+    cols_valid = np.concatenate([gray[:, :band], gray[:, -band:]], axis=1).T
+    edges = (cols[:, 1:] > threshold) != (cols[:, :-1] > threshold)
+    edges &= cols_valid[:, 1:] & cols_valid[:, :-1]
+    y_edges = np.nonzero(edges)[1] + 1
+    y0 = int(np.bincount(y_edges % period, minlength=period).argmax()) if len(y_edges) else 0
+
+    # Shade of each parity, measured on the same border bands
+    yy, xx = np.indices((height, width), sparse=True)
+    parity = ((xx - x0) // period + (yy - y0) // period) % 2
+    border = np.zeros((height, width), dtype=bool)
+    border[:band] = border[-band:] = True
+    border[:, :band] = border[:, -band:] = True
+    border &= gray
+    shades = []
+    for p in (0, 1):
+        values = level[border & (parity == p)]
+        if len(values) == 0:
+            return None
+        shades.append(int(np.median(values)))
+    return {'period': period, 'phase': (x0, y0), 'shades': tuple(shades)}
+
+
+def checker_mask(arr, checker, tolerance=10):
+    """Opaque gray pixels whose shade matches the checkerboard cell they sit in"""
+    height, width = arr.shape[:2]
+    period = checker['period']
+    x0, y0 = checker['phase']
+    yy, xx = np.indices((height, width), sparse=True)
+    parity = ((xx - x0) // period + (yy - y0) // period) % 2
+    expected = np.where(parity == 0, *checker['shades']).astype(np.int16)
+    r, g, b = _channels(arr)
+    return (_gray(arr, tolerance) & (arr[..., 3] == 255) &
+            (np.abs(r - expected) < tolerance) & (np.abs(g - expected) < tolerance) &
+            (np.abs(b - expected) < tolerance))
+
+
+# =============================================================================
+# Key colour detection from the image borders
+# =============================================================================
+def border_pixels(arr, border=4):
+    """RGB (int16, n x 3) of the visible pixels in a `border` px frame around the image"""
+    height, width = arr.shape[:2]
+    b = max(1, min(border, height // 2, width // 2))
+    frame = np.concatenate([
+        arr[:b].reshape(-1, 4), arr[height - b:].reshape(-1, 4),
+        arr[b:height - b, :b].reshape(-1, 4), arr[b:height - b, width - b:].reshape(-1, 4),
+    ])
+    return frame[frame[:, 3] > 0, :3].astype(np.int16)
+
+
+def detect_key_colors(arr, border=4, bin_size=8, min_share=0.05, max_colors=8,
+                      margin=6, max_tolerance=64):
+    """
+    Background key colours from the image border, as (r, g, b, tolerance)
+    tuples for key_color_mask / matte.
+
+    The border pixels are binned into an RGB histogram (bins of bin_size
+    levels per channel, a power of two). The fullest bin seeds a cluster: pixels within 2 * bin_size
+    (per channel) of its median, re-centred twice. The key is the cluster
+    median and its tolerance covers 99% of the members plus margin, capped at
+    max_tolerance. Keyed pixels are removed and the next fullest bin is tried
+    until a cluster holds less than min_share of the border (sprite pixels
+    touching the edge) or max_colors keys were found. Noisy screens and
+    checkerboards (one key per shade) come out as one or a few keys.
+    """
+    rgb = border_pixels(arr, border)
+    total = len(rgb)
+    shift = int(bin_size).bit_length() - 1
+    levels = 256 >> shift
+    bins = ((rgb[:, 0] >> shift) * levels + (rgb[:, 1] >> shift)) * levels + (rgb[:, 2] >> shift)
+    radius = 2 * (1 << shift)
+
+    keys = []
+    remaining = np.ones(total, dtype=bool)
+    while len(keys) < max_colors and remaining.sum() >= max(1, min_share * total):
+        top = np.bincount(bins[remaining], minlength=levels ** 3).argmax()
+        members = remaining & (bins == top)
+        for _ in range(3):
+            center = np.rint(np.median(rgb[members], axis=0))
+            members = remaining & (np.abs(rgb - center).max(axis=1) <= radius)
+        if members.sum() < min_share * total:
+            break
+        spread = np.percentile(np.abs(rgb[members] - center).max(axis=1), 99)
+        tolerance = int(min(spread + 1 + margin, max_tolerance))
+        key = tuple(int(v) for v in center)
+        keys.append(key + (tolerance,))
+        remaining &= ~(np.abs(rgb - center).max(axis=1) < tolerance)
+    return keys
+
+
+def auto_key_mask(arr, **kwargs):
+    """key_color_mask with the key colours detected from the borders (detect_key_colors kwargs)"""
+    keys = detect_key_colors(arr, **kwargs)
+    if not keys:
+        return np.zeros(arr.shape[:2], dtype=bool)
+    return key_color_mask(arr, keys)
+
+
+# =============================================================================
+# Matte: soft alpha, despill and tight crop
+# =============================================================================
+def key_distance(arr, key_colors):
+    """
+    Distance to the nearest key colour in units of its tolerance: the largest
+    per-channel |channel - key| divided by the tolerance. Below 1 is exactly
+    the key_color_mask test. Returns (distance, index of the nearest key).
+    """
+    # Whole-plane uint8 operations into preallocated buffers: a max over the
+    # length-3 channel axis, or a table lookup, costs several times more
+    shape = arr.shape[:2]
+    channels = [np.ascontiguousarray(arr[..., c]) for c in range(3)]
+    key, hi, lo, d = (np.empty(shape, dtype=np.uint8) for _ in range(4))
+    scaled = np.empty(shape, dtype=np.float32)
+    closer = np.empty(shape, dtype=bool)
+    best = np.full(shape, np.inf, dtype=np.float32)
+    nearest = np.zeros(shape, dtype=np.uint8)
+    for k, (key_r, key_g, key_b, tolerance) in enumerate(key_colors):
+        for c, (channel, value) in enumerate(zip(channels, (key_r, key_g, key_b))):
+            # |channel - value| as max - min, which cannot wrap around in uint8
+            key.fill(value)
+            np.maximum(channel, key, out=hi)
+            np.minimum(channel, key, out=lo)
+            np.subtract(hi, lo, out=d if c == 0 else hi)
+            if c > 0:
+                np.maximum(d, hi, out=d)
+        np.divide(d, np.float32(tolerance), out=scaled)
+        np.less(scaled, best, out=closer)
+        np.minimum(scaled, best, out=best)
+        np.putmask(nearest, closer, k)
+    return best, nearest
+
+
+def dilate(mask, radius=1):
+    """4-neighbour dilation repeated radius times"""
+    out = mask.copy()
+    for _ in range(radius):
+        grown = out.copy()
+        grown[1:, :] |= out[:-1, :]
+        grown[:-1, :] |= out[1:, :]
+        grown[:, 1:] |= out[:, :-1]
+        grown[:, :-1] |= out[:, 1:]
+        out = grown
+    return out
+
+
+def _spill_channels(key):
+    """Channels that carry the key colour (above the key's mean) and the others"""
+    rgb = np.array(key[:3], dtype=float)
+    dominant = [c for c in range(3) if rgb[c] > rgb.mean()]
+    others = [c for c in range(3) if rgb[c] <= rgb.mean()]
+    return dominant, others
+
+
+def matte(arr, key_colors, feather=0.5, despill=True, spill_radius=2):
+    """
+    Soft-edged version of chroma_key (in place, returns arr).
+
+    Alpha fades from 0 at the tolerance boundary (key distance 1) to unchanged
+    at distance 1 + feather. On the edge (partially keyed pixels and pixels
+    within spill_radius of keyed ones) the key colour is removed: the excess of
+    the key's dominant channels over the others (G over max(R, B) for green,
+    min(R, B) over G for magenta) is subtracted.
+    feather=0 and despill=False give exactly chroma_key.
+    """
+    distance, nearest = key_distance(arr, key_colors)
+    if feather > 0:
+        factor = np.clip((distance - 1.0) / feather, 0.0, 1.0)
+    else:
+        factor = (distance >= 1.0).astype(np.float32)
+
+    if despill:
+        keyed = factor == 0
+        edge = ((factor < 1) | dilate(keyed, spill_radius)) & ~keyed
+        # Only edge pixels change, so gather them once as an (n, 3) array
+        rgb = arr[..., :3][edge].astype(np.int16)
+        edge_nearest = nearest[edge]
+        for k, key in enumerate(key_colors):
+            dominant, others = _spill_channels(key)
+            if not dominant or not others:
+                continue  # gray/white keys have no hue to remove
+            sel = edge_nearest == k
+            px = rgb[sel]
+            low = reduce(np.minimum, [px[:, c] for c in dominant])
+            high = reduce(np.maximum, [px[:, c] for c in others])
+            spill = (low - high).clip(min=0)
+            for c in dominant:
+                px[:, c] -= spill
+            rgb[sel] = px
+        arr[..., :3][edge] = rgb
+
+    arr[..., 3] = np.rint(arr[..., 3] * factor).astype(np.uint8)
+    return arr
+
+
+def crop_to_content(arr, alpha_min=0):
+    """
+    Crop to the bounding box of pixels with alpha > alpha_min.
+    Returns (cropped, (x, y)) where (x, y) is the crop's offset in arr; a fully
+    transparent image keeps one pixel.
+    """
+    visible = arr[..., 3] > alpha_min
+    rows = np.flatnonzero(visible.any(axis=1))
+    cols = np.flatnonzero(visible.any(axis=0))
+    if len(rows) == 0:
+        return arr[:1, :1], (0, 0)
+    y0, y1 = rows[0], rows[-1] + 1
+    x0, x1 = cols[0], cols[-1] + 1
+    return arr[y0:y1, x0:x1], (int(x0), int(y0))
@@ -0,0 +1,204 @@
+#!/usr/bin/env python3
+"""
+Lossless PNG size optimizer, the last asset stage.
+
+    python pngopt.py [--clean-alpha] [--effort fast|normal|max] image.png ...
+
+For every image it tries the colour types that hold the pixels exactly (RGBA,
+RGB, gray, gray+alpha, palette with per-entry alpha at 1/2/4/8 bits) with
+every PNG row filter strategy, ranks those with a quick deflate and searches
+zlib strategies at level 9 for the best few.
+It writes only IHDR, PLTE, tRNS, IDAT and IEND (metadata is dropped) and keeps
+the smallest encoding. The result is decoded again and compared with the
+original RGBA pixels, and a file is only replaced when the result is smaller.
+Sources that are not 8-bit (or lower) L, LA, RGB, RGBA or P, such as 16-bit
+PNGs, would lose precision in that conversion and are rejected.
+
+clean_alpha=True also sets the colour of fully transparent pixels to 0, which
+is invisible when drawn but often lets the image fit a palette. It changes
+the stored RGB of those pixels, so it is opt-in.
+"""
+
+import argparse
+import io
+import os
+import struct
+import sys
+import zlib
+
+from PIL import Image
+import numpy as np
+
+from pngstream import PNG_SIGNATURE, FILTER_ROWS, _chunk, filter_rows
+
+# (filter methods, zlib strategies, layouts kept for the final search) per effort level
+EFFORT = {
+    'fast': ([0, 'adaptive'], [zlib.Z_DEFAULT_STRATEGY], 1),
+    'normal': ([0, 1, 2, 4, 'adaptive'], [zlib.Z_DEFAULT_STRATEGY, zlib.Z_FILTERED], 2),
+    'max': ([0, 1, 2, 3, 4, 'adaptive'], [zlib.Z_DEFAULT_STRATEGY, zlib.Z_FILTERED, zlib.Z_RLE], 6),
+}
+# Source modes whose pixels survive the conversion to 8-bit RGBA
+SUPPORTED_MODES = ('L', 'LA', 'RGB', 'RGBA', 'P')
+# zlib level used to rank the layout/filter pairs before the level 9 search
+SCREEN_LEVEL = 3
+
+def _pack_bits(indices, depth):
+    """Pack (h, w) palette indices into rows of depth-bit samples"""
+    if depth == 8:
+        return indices.astype(np.uint8)
+    per_byte = 8 // depth
+    h, w = indices.shape
+    padded = np.zeros((h, -(-w // per_byte) * per_byte), dtype=np.uint8)
+    padded[:, :w] = indices
+    groups = padded.reshape(h, -1, per_byte)
+    shifts = np.arange(per_byte - 1, -1, -1, dtype=np.uint8) * depth
+    return np.bitwise_or.reduce(groups << shifts, axis=2).astype(np.uint8)
+
+
+def candidates(arr):
+    """
+    Colour-type layouts that store arr exactly:
+    list of (name, color_type, bit_depth, rows, bpp, extra_chunks)
+    """
+    h, w = arr.shape[:2]
+    rgb = arr[..., :3]
+    alpha = arr[..., 3]
+    opaque = bool((alpha == 255).all())
+    gray = bool(((rgb[..., 0] == rgb[..., 1]) & (rgb[..., 1] == rgb[..., 2])).all())
+
+    found = [('rgba', 6, 8, arr.reshape(h, w * 4), 4, b'')]
+    if opaque:
+        found.append(('rgb', 2, 8, rgb.reshape(h, w * 3), 3, b''))
+    if gray and opaque:
+        found.append(('gray', 0, 8, arr[..., 0].copy(), 1, b''))
+    elif gray:
+        found.append(('gray_alpha', 4, 8, arr[..., [0, 3]].reshape(h, w * 2), 2, b''))
+
+    packed = arr.reshape(-1, 4).view(np.uint32).ravel()
+    colors, inverse = np.unique(packed, return_inverse=True)
+    if len(colors) <= 256:
+        entries = colors.view(np.uint8).reshape(-1, 4)
+        # Translucent entries first, so tRNS only covers them
+        order = np.argsort(entries[:, 3] == 255, kind='stable')
+        remap = np.empty(len(order), dtype=np.uint8)
+        remap[order] = np.arange(len(order), dtype=np.uint8)
+        entries = entries[order]
+        indices = remap[inverse].reshape(h, w)
+
+        depth = next(d for d in (1, 2, 4, 8) if len(colors) <= 1 << d)
+        extra = _chunk(b'PLTE', entries[:, :3].tobytes())
+        n_trns = int(np.count_nonzero(entries[:, 3] != 255))
+        if n_trns:
+            extra += _chunk(b'tRNS', entries[:n_trns, 3].tobytes())
+        found.append(('palette', 3, depth, _pack_bits(indices, depth), 1, extra))
+    return found
+
+
+def _filtered(rows, bpp, method):
+    prev = np.zeros(rows.shape[1], dtype=np.int16)
+    blocks = []
+    for start in range(0, rows.shape[0], FILTER_ROWS):
+        block = rows[start:start + FILTER_ROWS]
+        blocks.append(filter_rows(block, prev, bpp, method).tobytes())
+        prev = block[-1].astype(np.int16)
+    return b''.join(blocks)
+
+
+def _deflate(data, level, strategy=zlib.Z_DEFAULT_STRATEGY):
+    deflater = zlib.compressobj(level, zlib.DEFLATED, 15, 9, strategy)
+    return deflater.compress(data) + deflater.flush()
+
+
+def encode(width, height, color_type, depth, idat, extra):
+    ihdr = struct.pack('>IIBBBBB', width, height, depth, color_type, 0, 0, 0)
+    return PNG_SIGNATURE + _chunk(b'IHDR', ihdr) + extra + _chunk(b'IDAT', idat) + _chunk(b'IEND', b'')
+
+
+def _decodes_to(png, arr):
+    with Image.open(io.BytesIO(png)) as img:
+        return np.array_equal(np.array(img.convert('RGBA')), arr)
+
+
+def optimize_array(arr, effort='normal'):
+    """Smallest verified PNG encoding of an RGBA array: (bytes, description)"""
+    methods, strategies, keep = EFFORT[effort]
+    h, w = arr.shape[:2]
+
+    # Rank every layout/filter pair with a quick deflate, then spend level 9
+    # and the strategy search only on the most promising ones
+    screened = []
+    for name, color_type, depth, rows, bpp, extra in candidates(arr):
+        for method in methods:
+            data = _filtered(rows, bpp, method)
+            screened.append((len(_deflate(data, SCREEN_LEVEL)), name, color_type, depth, method, data, extra))
+    screened.sort(key=lambda c: c[0])
+
+    results = []
+    for _, name, color_type, depth, method, data, extra in screened[:keep]:
+        for strategy in strategies:
+            png = encode(w, h, color_type, depth, _deflate(data, 9, strategy), extra)
+            results.append((len(png), png, f"{name} {depth}-bit, filter {method}, zlib strategy {strategy}"))
+    results.sort(key=lambda r: r[0])
+    for _, png, description in results:
+        if _decodes_to(png, arr):
+            return png, description
+    raise ValueError("No PNG encoding decoded back to the original pixels")
+
+def optimize_file(path, output_path=None, clean_alpha=False, effort='normal'):
+    """
+    Optimize a PNG (in place unless output_path is given).
+    Returns (old_size, new_size, description); description is None when the
+    original was already the smallest and was kept.
+    """
+    output_path = output_path or path
+    with open(path, 'rb') as f:
+        original = f.read()
+    with Image.open(io.BytesIO(original)) as img:
+        if img.format != 'PNG':
+            raise ValueError(f"{path} is not a PNG file")
+        # PIL decodes 16-bit RGB(A) to 8 bits and 16-bit gray to mode I, so
+        # converting those to RGBA would throw away precision
+        bit_depth = original[24] if original[12:16] == b'IHDR' else None
+        if bit_depth is None or bit_depth > 8 or img.mode not in SUPPORTED_MODES:
+            raise ValueError(f"{path} is not an 8-bit {'/'.join(SUPPORTED_MODES)} PNG "
+                             f"(mode {img.mode}, {bit_depth} bits)")
+        arr = np.array(img.convert('RGBA'))
+    if clean_alpha:
+        arr[arr[..., 3] == 0] = 0
+
+    png, description = optimize_array(arr, effort)
+    if len(png) >= len(original):
+        png, description = original, None
+    if output_path != path or description is not None:
+        tmp_path = output_path + '.tmp'
+        with open(tmp_path, 'wb') as f:
+            f.write(png)
+        os.replace(tmp_path, output_path)
+    return len(original), len(png), description
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description='Losslessly shrink PNG files in place.')
+    parser.add_argument('files', nargs='+')
+    parser.add_argument('--clean-alpha', action='store_true',
+                        help='zero the colour of fully transparent pixels')
+    parser.add_argument('--effort', choices=list(EFFORT), default='normal')
+    args = parser.parse_args(argv)
+
+    total_old = total_new = 0
+    for path in args.files:
+        try:
+            old, new, description = optimize_file(path, clean_alpha=args.clean_alpha, effort=args.effort)
+        except ValueError as e:
+            print(f"Skipped: {e}")
+            continue
+        total_old += old
+        total_new += new
+        print(f"{path}: {old} -> {new} bytes ({description or 'kept original'})")
+    if total_old:
+        print(f"Total: {total_old} -> {total_new} bytes ({(1 - total_new / total_old) * 100:.1f}% smaller)")
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,286 @@
+#!/usr/bin/env python3
+"""
+Streaming PNG reading and writing in bands of rows.
+
+PIL decodes a whole PNG into memory, which breaks down for very large
+background art. Here the compressed image data is inflated incrementally and
+handed out as RGBA bands of a fixed number of rows, and the writer filters and
+deflates band by band, so peak memory depends on the band size (width x rows),
+not on the image height.
+
+Reading: each band of filtered rows is wrapped into a small stand-alone PNG
+(with the previous row, unfiltered, as a filter-0 lead-in row) and decoded by
+PIL, so filters, palettes and tRNS are handled exactly as in
+Image.open(...).convert('RGBA'). Supported: non-interlaced, 8-bit gray, RGB,
+palette, gray+alpha and RGBA. Anything else (interlaced or 16-bit PNGs, or a
+JPEG named .png) raises ValueError from open_bands; iter_rgba_bands then falls
+back to decoding the whole image.
+
+Writing: RGBA, 8 bit. The filter of every row is picked from the five PNG
+filters with the minimum-sum-of-absolute-differences heuristic and the data
+goes through one zlib stream cut into fixed-size IDAT chunks. Neither choice
+depends on where the bands start, so the file is byte-identical whatever band
+size was used, including one band for the whole image. It is not
+byte-identical to PIL's Image.save of the same pixels (PIL picks other filters
+and zlib settings); only the decoded pixels match.
+"""
+
+import io
+import struct
+import zlib
+
+from PIL import Image
+import numpy as np
+
+PNG_SIGNATURE = b'\x89PNG\r\n\x1a\n'
+IDAT_SIZE = 1 << 16
+FILTER_ROWS = 32
+
+# channels per colour type (8-bit only)
+_CHANNELS = {0: 1, 2: 3, 3: 1, 4: 2, 6: 4}
+
+
+def _chunk(kind, data):
+    return (struct.pack('>I', len(data)) + kind + data +
+            struct.pack('>I', zlib.crc32(kind + data) & 0xffffffff))
+
+
+def _read_chunks(f):
+    """Yield (kind, data) for every chunk after the signature"""
+    while True:
+        header = f.read(8)
+        if len(header) < 8:
+            raise ValueError("Truncated PNG")
+        length, kind = struct.unpack('>I4s', header)
+        data = f.read(length)
+        f.read(4)  # CRC
+        yield kind, data
+        if kind == b'IEND':
+            return
+
+
+class PngBandReader:
+    """Iterate over an 8-bit, non-interlaced PNG as RGBA bands of `rows` rows."""
+
+    def __init__(self, path, rows=256):
+        self.path = path
+        self.rows = rows
+        self._file = open(path, 'rb')
+        try:
+            if self._file.read(8) != PNG_SIGNATURE:
+                raise ValueError(f"{path} is not a PNG file")
+            self._chunks = _read_chunks(self._file)
+            kind, ihdr = next(self._chunks)
+            if kind != b'IHDR':
+                raise ValueError("PNG does not start with IHDR")
+            self.width, self.height, depth, self.color_type, _, _, interlace = struct.unpack('>IIBBBBB', ihdr)
+            if depth != 8 or self.color_type not in _CHANNELS or interlace:
+                raise ValueError(f"Unsupported PNG for streaming (depth {depth}, colour type "
+                                 f"{self.color_type}, interlace {interlace})")
+            self._ihdr = ihdr
+            self.row_bytes = self.width * _CHANNELS[self.color_type]
+
+            # Palette and transparency come before the first IDAT
+            self._extra = b''
+            self._first_idat = None
+            for kind, data in self._chunks:
+                if kind in (b'PLTE', b'tRNS'):
+                    self._extra += _chunk(kind, data)
+                elif kind == b'IDAT':
+                    self._first_idat = data
+                    break
+                elif kind == b'IEND':
+                    break
+        except Exception:
+            self._file.close()
+            raise
+
+    @property
+    def size(self):
+        return self.width, self.height
+
+    def _idat_data(self):
+        if self._first_idat is not None:
+            yield self._first_idat
+        for kind, data in self._chunks:
+            if kind == b'IDAT':
+                yield data
+
+    def _filtered_rows(self):
+        """Yield blocks of (filter byte + row) data, at most `rows` rows each"""
+        stride = self.row_bytes + 1
+        block_size = stride * self.rows
+        inflater = zlib.decompressobj()
+        pending = bytearray()
+        for data in self._idat_data():
+            while data:
+                # Bound the inflated size per step: highly compressible data expands a lot
+                pending += inflater.decompress(data, block_size)
+                data = inflater.unconsumed_tail
+                while len(pending) >= block_size:
+                    yield bytes(pending[:block_size])
+                    del pending[:block_size]
+        pending += inflater.flush()
+        full = len(pending) - len(pending) % stride
+        if full:
+            yield bytes(pending[:full])
+
+    def _decode(self, filtered, lead_in):
+        """Decode a block of filtered rows with PIL, given the previous raw row"""
+        n_rows = len(filtered) // (self.row_bytes + 1)
+        if lead_in is not None:
+            filtered = b'\x00' + lead_in + filtered
+            n_rows += 1
+        ihdr = struct.pack('>II', self.width, n_rows) + self._ihdr[8:]
+        png = (PNG_SIGNATURE + _chunk(b'IHDR', ihdr) + self._extra +
+               _chunk(b'IDAT', zlib.compress(filtered, 0)) + _chunk(b'IEND', b''))
+        with Image.open(io.BytesIO(png)) as img:
+            img.load()
+            raw = img.tobytes()
+            rgba = np.array(img.convert('RGBA'))
+        last_row = raw[-self.row_bytes:]
+        if lead_in is not None:
+            rgba = rgba[1:]
+        return rgba, last_row
+
+    def __iter__(self):
+        lead_in = None
+        try:
+            for filtered in self._filtered_rows():
+                band, lead_in = self._decode(filtered, lead_in)
+                yield band
+        finally:
+            self.close()
+
+    def close(self):
+        self._file.close()
+
+
+def open_bands(path, rows=256):
+    """PngBandReader for path; ValueError if the file cannot be streamed"""
+    return PngBandReader(path, rows)
+
+
+def image_size(path):
+    with Image.open(path) as img:
+        return img.size
+
+
+def iter_rgba_bands(path, rows=256):
+    """
+    RGBA bands of `rows` rows. Streams supported PNGs, otherwise decodes the
+    whole image once and slices it (same pixels, unbounded memory).
+    """
+    try:
+        reader = open_bands(path, rows)
+    except ValueError:
+        with Image.open(path) as img:
+            arr = np.array(img.convert('RGBA'))
+        for start in range(0, arr.shape[0], rows):
+            yield arr[start:start + rows]
+        return
+    yield from reader
+
+
+def _paeth(a, b, c):
+    p = a + b - c
+    pa, pb, pc = np.abs(p - a), np.abs(p - b), np.abs(p - c)
+    return np.where((pa <= pb) & (pa <= pc), a, np.where(pb <= pc, b, c))
+
+
+def filter_rows(rows, prev, bpp, method='adaptive'):
+    """
+    PNG-filter a block of raw rows (n, row_bytes) given the raw row above it
+    (zeros for the first row of the image); bpp is the filter's bytes per
+    pixel (at least 1). method is a filter type 0-4 for every row or
+    'adaptive' (per row minimum sum of absolute differences, as libpng).
+    Returns (n, row_bytes + 1) uint8 with the filter type in column 0.
+    """
+    n = rows.shape[0]
+    x = rows.astype(np.int16)
+    up = np.vstack([np.asarray(prev, dtype=np.int16)[None, :], x[:-1]])
+    left = np.zeros_like(x)
+    left[:, bpp:] = x[:, :-bpp]
+    up_left = np.zeros_like(x)
+    up_left[:, bpp:] = up[:, :-bpp]
+
+    filters = [
+        lambda: x,
+        lambda: x - left,
+        lambda: x - up,
+        lambda: x - (left + up) // 2,
+        lambda: x - _paeth(left, up, up_left),
+    ]
+    out = np.empty((n, x.shape[1] + 1), dtype=np.uint8)
+    if method == 'adaptive':
+        candidates = np.stack([f() for f in filters]) & 0xff
+        # Minimum sum of absolute differences, bytes read as signed
+        signed = np.where(candidates > 127, 256 - candidates, candidates)
+        choice = np.argmin(signed.sum(axis=2), axis=0)
+        out[:, 0] = choice
+        out[:, 1:] = candidates[choice, np.arange(n)]
+    else:
+        out[:, 0] = method
+        out[:, 1:] = filters[method]() & 0xff
+    return out
+
+
+class PngBandWriter:
+    """Write an 8-bit RGBA PNG one band of rows at a time."""
+
+    def __init__(self, path, width, height, level=6):
+        self.path = path
+        self.width = width
+        self.height = height
+        self.rows_written = 0
+        self._prev = np.zeros((width * 4,), dtype=np.int16)
+        self._deflater = zlib.compressobj(level, zlib.DEFLATED, 15, 9)
+        self._buffer = bytearray()
+        self._file = open(path, 'wb')
+        self._file.write(PNG_SIGNATURE)
+        self._file.write(_chunk(b'IHDR', struct.pack('>IIBBBBB', width, height, 8, 6, 0, 0, 0)))
+
+    def _filter_band(self, band):
+        """Filter type byte + filtered bytes for every row, as one bytes object"""
+        rows = band.reshape(band.shape[0], -1)
+        out = filter_rows(rows, self._prev, 4)
+        self._prev = rows[-1].astype(np.int16)
+        return out.tobytes()
+
+    def write_band(self, band):
+        band = np.ascontiguousarray(band, dtype=np.uint8)
+        if band.shape[1:] != (self.width, 4):
+            raise ValueError(f"Band shape {band.shape} does not match width {self.width} RGBA")
+        if self.rows_written + band.shape[0] > self.height:
+            raise ValueError("More rows than the image height")
+        # Filter in small steps: the five filter candidates cost ~20 bytes per pixel
+        for start in range(0, band.shape[0], FILTER_ROWS):
+            self._buffer += self._deflater.compress(self._filter_band(band[start:start + FILTER_ROWS]))
+            self._write_idat()
+        self.rows_written += band.shape[0]
+
+    def _write_idat(self, final=False):
+        # Fixed-size IDAT chunks, independent of the band boundaries
+        while len(self._buffer) >= IDAT_SIZE or (final and self._buffer):
+            self._file.write(_chunk(b'IDAT', bytes(self._buffer[:IDAT_SIZE])))
+            del self._buffer[:IDAT_SIZE]
+
+    def close(self):
+        if self._file.closed:
+            return
+        if self.rows_written != self.height:
+            self._file.close()
+            raise ValueError(f"Wrote {self.rows_written} of {self.height} rows")
+        self._buffer += self._deflater.flush()
+        self._write_idat(final=True)
+        self._file.write(_chunk(b'IEND', b''))
+        self._file.close()
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, exc_type, exc, tb):
+        if exc_type is None:
+            self.close()
+        else:
+            self._file.close()
@@ -0,0 +1,29 @@
+// Sprite atlas built by build_assets.py (atlas.py): one texture + JSON frame map.
+// Frames are trimmed; draw() maps them back into the original sprite rectangle.
+export class Atlas {
+    constructor(imageSrc, dataSrc) {
+        this.frames = null;
+        this.img = new Image();
+        fetch(dataSrc)
+            .then(response => response.json())
+            .then(data => {
+                this.frames = data.frames;
+                this.img.src = imageSrc;
+            });
+    }
+
+    get ready() {
+        return this.frames !== null && this.img.complete && this.img.naturalWidth > 0;
+    }
+
+    // Draw frame `name` as if the untrimmed sprite filled (x, y, w, h)
+    draw(ctx, name, x, y, w, h) {
+        const f = this.frames[name];
+        const sx = w / f.sourceSize.w;
+        const sy = h / f.sourceSize.h;
+        ctx.drawImage(this.img,
+            f.frame.x, f.frame.y, f.frame.w, f.frame.h,
+            x + f.spriteSourceSize.x * sx, y + f.spriteSourceSize.y * sy,
+            f.frame.w * sx, f.frame.h * sy);
+    }
+}
@@ -1,9 +1,9 @@
 export class Player {
-    constructor(gameW, gameH, imgSrc) {
+    constructor(gameW, gameH, atlas, frame) {
         this.gameW = gameW;
         this.gameH = gameH;
-        this.img = new Image();
-        this.img.src = imgSrc;
+        this.atlas = atlas;
+        this.frame = frame;
         this.width = 64;
         this.height = 64;
         this.x = 100;
@@ -25,8 +25,8 @@ export class Player {
     }
 
     draw(ctx) {
-        if (this.img.complete) {
-            ctx.drawImage(this.img, this.x, this.y, this.width, this.height);
+        if (this.atlas.ready) {
+            this.atlas.draw(ctx, this.frame, this.x, this.y, this.width, this.height);
         } else {
             ctx.fillStyle = 'red';
             ctx.fillRect(this.x, this.y, this.width, this.height);
@@ -39,12 +39,12 @@ export class Player {
 }
 
 export class Obstacle {
-    constructor(gameW, gameH, type, imgSrc, speed) {
+    constructor(gameW, gameH, type, atlas, frame, speed) {
         this.gameW = gameW;
         this.gameH = gameH;
         this.type = type; // 'roof', 'cutter', 'construction'
-        this.img = new Image();
-        this.img.src = imgSrc;
+        this.atlas = atlas;
+        this.frame = frame;
         this.width = 64;
         this.height = 64;
         this.x = gameW;
@@ -59,8 +59,8 @@ export class Obstacle {
     }
 
     draw(ctx) {
-        if (this.img.complete) {
-            ctx.drawImage(this.img, this.x, this.y, this.width, this.height);
+        if (this.atlas.ready) {
+            this.atlas.draw(ctx, this.frame, this.x, this.y, this.width, this.height);
         } else {
             ctx.fillStyle = 'gray';
             ctx.fillRect(this.x, this.y, this.width, this.height);
@@ -73,11 +73,11 @@ export class Obstacle {
 }
 
 export class Item {
-    constructor(gameW, gameH, imgSrc, speed) {
+    constructor(gameW, gameH, atlas, frame, speed) {
         this.gameW = gameW;
         this.gameH = gameH;
-        this.img = new Image();
-        this.img.src = imgSrc;
+        this.atlas = atlas;
+        this.frame = frame;
         this.width = 48;
         this.height = 48;
         this.x = gameW;
@@ -92,8 +92,8 @@ export class Item {
     }
 
     draw(ctx) {
-        if (this.img.complete) {
-            ctx.drawImage(this.img, this.x, this.y, this.width, this.height);
+        if (this.atlas.ready) {
+            this.atlas.draw(ctx, this.frame, this.x, this.y, this.width, this.height);
         } else {
             ctx.fillStyle = 'yellow';
             ctx.fillRect(this.x, this.y, this.width, this.height);
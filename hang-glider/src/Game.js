@@ -1,12 +1,15 @@
 import { Player, Obstacle, Item } from './Entities.js';
 import { InputHandler } from './Input.js';
 import { AudioHandler } from './Audio.js';
+import { Atlas } from './Atlas.js';
 
 export class Game {
     constructor(canvasWidth, canvasHeight) {
         this.width = canvasWidth;
         this.height = canvasHeight;
-        this.player = new Player(this.width, this.height, 'assets/player.png');
+        // All sprites come from one texture (built by build_assets.py)
+        this.atlas = new Atlas('assets/atlas.png', 'assets/atlas.json');
+        this.player = new Player(this.width, this.height, this.atlas, 'player');
         this.input = new InputHandler();
         this.audio = new AudioHandler();
 
@@ -31,9 +34,9 @@ export class Game {
 
         // Obstacle types
         this.obstacleTypes = [
-            { type: 'roof', src: 'assets/obstacle_roof.png' },
-            { type: 'cutter', src: 'assets/obstacle_cutter.png' },
-            { type: 'construction', src: 'assets/obstacle_construction.png' }
+            { type: 'roof', frame: 'obstacle_roof' },
+            { type: 'cutter', frame: 'obstacle_cutter' },
+            { type: 'construction', frame: 'obstacle_construction' }
         ];
     }
 
@@ -48,7 +51,7 @@ export class Game {
             // Spawning Obstacles
             if (this.enemyTimer > this.enemyInterval) {
                 const randomType = this.obstacleTypes[Math.floor(Math.random() * this.obstacleTypes.length)];
-                this.obstacles.push(new Obstacle(this.width, this.height, randomType.type, randomType.src, this.bgSpeed + 2));
+                this.obstacles.push(new Obstacle(this.width, this.height, randomType.type, this.atlas, randomType.frame, this.bgSpeed + 2));
                 this.enemyTimer = 0;
             } else {
                 this.enemyTimer += deltaTime;
@@ -56,7 +59,7 @@ export class Game {
 
             // Spawning Items
             if (this.itemTimer > this.itemInterval) {
-                this.items.push(new Item(this.width, this.height, 'assets/item_candy.png', this.bgSpeed + 2));
+                this.items.push(new Item(this.width, this.height, this.atlas, 'item_candy', this.bgSpeed + 2));
                 this.itemTimer = 0;
             } else {
                 this.itemTimer += deltaTime;
@@ -2,6 +2,10 @@ import pygame
 import random
 import numpy as np
 import math
+import hashlib
+import json
+import os
+from collections import OrderedDict, namedtuple
 
 # --- Constants ---
 SCREEN_WIDTH = 800
@@ -22,8 +26,16 @@ PLAYER_SPEED = 5
 SPAWN_INTERVAL = 60 # Frames
 
 # --- Audio Synthesis ---
-def generate_tone(frequency, duration, volume=0.5, wave_type='sine'):
-    sample_rate = 44100
+SAMPLE_RATE = 44100
+
+# Synthesized sounds are cached here between launches (see AudioCache)
+AUDIO_CACHE_DIR = os.path.join(os.path.dirname(os.path.abspath(__file__)), '.audio_cache')
+# Bump when the synthesis code changes, so every cached buffer is rebuilt
+AUDIO_CACHE_VERSION = 3
+
+def render_tone(frequency, duration, volume=0.5, wave_type='sine'):
+    """Mono int16 samples of one tone with a linear attack/decay envelope"""
+    sample_rate = SAMPLE_RATE
     n_samples = int(sample_rate * duration)
     t = np.linspace(0, duration, n_samples, False)
     
@@ -50,48 +62,272 @@ def generate_tone(frequency, duration, volume=0.5, wave_type='sine'):
     wave = wave * envelope * volume
     
     # Convert to 16-bit integer
-    audio = (wave * 32767).astype(np.int16)
-    
-    # Check for stereo
-    if pygame.mixer.get_init() and pygame.mixer.get_num_channels() == 2:
+    return (wave * 32767).astype(np.int16)
+
+def to_mixer_format(audio):
+    """Duplicate mono samples into two columns when the mixer runs in stereo"""
+    # get_init() is (frequency, format, channels); get_num_channels() counts playback channels
+    init = pygame.mixer.get_init()
+    if init and init[2] == 2:
         audio = np.column_stack((audio, audio))
-        
-    return pygame.sndarray.make_sound(audio)
+    return audio
+
+def generate_tone(frequency, duration, volume=0.5, wave_type='sine'):
+    return pygame.sndarray.make_sound(to_mixer_format(render_tone(frequency, duration, volume, wave_type)))
+
+# --- Batch Synthesizer ---
+WAVETABLE_SIZE = 2048
+
+def _wavetables():
+    """One cycle of every periodic waveform, plus a wrap-around sample for interpolation"""
+    phase = np.arange(WAVETABLE_SIZE + 1) / WAVETABLE_SIZE
+    return {
+        'sine': np.sin(2 * np.pi * phase),
+        'square': np.where((phase % 1.0) < 0.5, 1.0, -1.0),
+        'sawtooth': 2 * (phase - np.floor(phase + 0.5)),
+        'triangle': 1 - 4 * np.abs(phase - np.floor(phase + 0.5)),
+    }
+
+WAVETABLES = _wavetables()
+WAVE_TYPES = list(WAVETABLES) + ['noise']
+
+# Attack, decay and release in seconds, sustain as a level (0-1). The release is
+# the end of the note's duration, so a note never sounds past start + duration.
+# The default is the generate_tone envelope.
+DEFAULT_ADSR = (0.01, 0.0, 1.0, 0.1)
+
+Note = namedtuple('Note', 'frequency start duration wave_type volume adsr',
+                  defaults=('sine', 0.5, DEFAULT_ADSR))
+
+def chord(frequencies, start, duration, **kwargs):
+    """Notes of the given frequencies sounding together"""
+    return [Note(f, start, duration, **kwargs) for f in frequencies]
+
+def sequence_score(notes, volume=0.5, wave_type='sine', adsr=DEFAULT_ADSR, sample_rate=SAMPLE_RATE):
+    """Score of (frequency, duration) notes played back to back"""
+    score = []
+    # Count the position in whole samples: summing float durations drifts, and
+    # a start a hair below a sample boundary would begin one sample early
+    position = 0
+    for frequency, duration in notes:
+        score.append(Note(frequency, position / sample_rate, duration, wave_type, volume, adsr))
+        position += int(sample_rate * duration)
+    return score
+
+def _adsr_envelope(t, n, adsr):
+    """
+    Envelope for every sample: t is the sample's index inside its note, n the
+    note length and adsr a (4, samples) array, all in samples. Segments are
+    scaled down together when attack + decay + release exceed the note.
+    """
+    attack, decay, sustain, release = adsr
+    scale = np.minimum(1.0, n / np.maximum(attack + decay + release, 1))
+    attack, decay, release = attack * scale, decay * scale, release * scale
+    release_start = n - release
+    return np.select(
+        [t < attack, t < attack + decay, t < release_start],
+        [t / np.maximum(attack, 1),
+         1 - (1 - sustain) * (t - attack) / np.maximum(decay, 1),
+         sustain],
+        sustain * (n - t) / np.maximum(release, 1))
+
+def render_score(notes, sample_rate=SAMPLE_RATE, length=None, seed=None):
+    """
+    Mix a score of Notes into one mono int16 buffer.
+
+    All notes are rendered together: every sample gets its note index, the
+    oscillators are linear-interpolated wavetable lookups at each note's
+    phase, ADSR envelopes are evaluated per sample from per-note parameters,
+    and the voices are summed into the output with one bincount, so there is
+    no Python loop over samples or voices. length (seconds) defaults to the
+    end of the last note; the mix is clipped to 16 bit.
+    """
+    notes = [Note(*n) for n in notes]
+    # Starts are rounded to the nearest sample, lengths truncated like render_tone
+    starts = np.array([round(n.start * sample_rate) for n in notes], dtype=np.int64)
+    counts = np.array([int(n.duration * sample_rate) for n in notes], dtype=np.int64)
+    if length is None:
+        total = int(np.max(starts + counts, initial=0))
+    else:
+        total = int(sample_rate * length)
+    if not notes or total == 0:
+        return np.zeros(total, dtype=np.int16)
+
+    counts = np.clip(counts, 0, np.maximum(total - starts, 0))
+    note = np.repeat(np.arange(len(notes)), counts)
+    t = np.arange(len(note)) - np.repeat(np.cumsum(counts) - counts, counts)
+
+    # Oscillators (noise voices read the sine table and are overwritten below)
+    frequency = np.array([n.frequency for n in notes], dtype=float)
+    wave_id = np.array([WAVE_TYPES.index(n.wave_type) for n in notes])
+    tables = np.stack(list(WAVETABLES.values()))
+    position = (t * (frequency[note] / sample_rate) % 1.0) * WAVETABLE_SIZE
+    index = position.astype(np.int64)
+    frac = position - index
+    table = np.where(wave_id < len(tables), wave_id, 0)[note]
+    wave = tables[table, index] * (1 - frac) + tables[table, index + 1] * frac
+    noise = wave_id[note] == WAVE_TYPES.index('noise')
+    if noise.any():
+        wave[noise] = np.random.default_rng(seed).uniform(-1, 1, np.count_nonzero(noise))
+
+    # Envelopes and mix
+    adsr = np.array([n.adsr for n in notes], dtype=float).T
+    adsr[[0, 1, 3]] *= sample_rate
+    envelope = _adsr_envelope(t, counts[note], adsr[:, note])
+    volume = np.array([n.volume for n in notes], dtype=float)
+    mix = np.bincount(starts[note] + t, weights=wave * envelope * volume[note], minlength=total)
+    return (np.clip(mix, -1.0, 1.0) * 32767).astype(np.int16)
+
+class AudioCache:
+    """
+    Synthesized sample buffers on disk: one int16 .npy file per sound, named
+    by a hash of its parameters and the mixer format, loaded memory-mapped.
+    Changed parameters (or another mixer format) give a new name, so a stale
+    buffer is never loaded; prune() at shutdown deletes the files nobody asked
+    for during the run.
+    """
+    def __init__(self, directory=AUDIO_CACHE_DIR):
+        self.directory = directory
+        self.used = set()
+
+    def _path(self, key):
+        recipe = json.dumps([AUDIO_CACHE_VERSION, SAMPLE_RATE, pygame.mixer.get_init(), key])
+        return os.path.join(self.directory, hashlib.sha256(recipe.encode()).hexdigest()[:32] + '.npy')
+
+    def load(self, key, render):
+        """Cached samples for key, or render() them and store the result"""
+        path = self._path(key)
+        self.used.add(os.path.basename(path))
+        try:
+            return np.load(path, mmap_mode='r')
+        except (OSError, ValueError):
+            pass  # missing or damaged: rebuild
+
+        samples = render()
+        try:
+            os.makedirs(self.directory, exist_ok=True)
+            # Write and rename, so an interrupted launch never leaves a partial buffer
+            tmp_path = path[:-4] + '.tmp.npy'
+            np.save(tmp_path, samples)
+            os.replace(tmp_path, path)
+        except OSError as e:
+            print(f"Could not write audio cache: {e}")
+        return samples
+
+    def prune(self):
+        """Delete cached buffers not loaded since this cache was created"""
+        try:
+            names = os.listdir(self.directory)
+        except OSError:
+            return 0
+        removed = 0
+        for name in names:
+            if name.endswith('.npy') and name not in self.used:
+                try:
+                    os.remove(os.path.join(self.directory, name))
+                    removed += 1
+                except OSError:
+                    pass
+        return removed
+
+class SoundBank:
+    """
+    Synthesized sounds, each rendered once and then shared.
+
+    Entries are keyed by their synthesis parameters. When the sample buffers
+    exceed max_bytes the least recently used ones are dropped. The cap only
+    covers the bank's own references: a sound that is still held elsewhere
+    stays alive until it is released there, so callers that want the cap to
+    apply should ask the bank again instead of keeping the sound.
+    With an AudioCache the samples come from disk when they were rendered before.
+    """
+    def __init__(self, max_bytes=16 * 1024 * 1024, cache=None):
+        self.max_bytes = max_bytes
+        self.cache = cache
+        self.used_bytes = 0
+        self._sounds = OrderedDict()  # key -> (sound, buffer bytes)
+
+    def tone(self, frequency, duration, volume=0.5, wave_type='sine'):
+        key = ('tone', frequency, duration, volume, wave_type)
+        return self._get(key, lambda: render_tone(frequency, duration, volume, wave_type))
+
+    def score(self, notes):
+        """A whole score of Notes (see render_score) as one sound"""
+        notes = tuple(Note(*n) for n in notes)
+        return self._get(('score', notes), lambda: render_score(notes))
+
+    def sequence(self, notes, volume=0.5, wave_type='sine'):
+        """The (frequency, duration) notes back to back in one buffer"""
+        return self.score(sequence_score(notes, volume, wave_type))
+
+    def _get(self, key, render):
+        entry = self._sounds.get(key)
+        if entry is not None:
+            self._sounds.move_to_end(key)
+            return entry[0]
+
+        if self.cache is not None:
+            samples = self.cache.load(key, lambda: to_mixer_format(render()))
+        else:
+            samples = to_mixer_format(render())
+        sound = pygame.sndarray.make_sound(samples)
+        self._sounds[key] = (sound, samples.nbytes)
+        self.used_bytes += samples.nbytes
+        while self.used_bytes > self.max_bytes and len(self._sounds) > 1:
+            _, (_, nbytes) = self._sounds.popitem(last=False)
+            self.used_bytes -= nbytes
+        return sound
 
 class AudioManager:
     def __init__(self):
-        self.sounds = {}
+        # Effects are looked up through the bank on every play, so its LRU cap
+        # really bounds them; only the looping BGM is held here for good
+        self.effects = {
+            'collect': (880, 0.1, 0.3, 'sine'),
+            'hit': (110, 0.3, 0.5, 'sawtooth'),
+            'gameover': (55, 1.0, 0.6, 'square'),
+            'win': (523.25, 0.5, 0.4, 'sine'),
+        }
+        self.bgm = None
+        self.bank = SoundBank(cache=AudioCache())
         self.bgm_notes = [
             (261.63, 0.2), (329.63, 0.2), (392.00, 0.2), (523.25, 0.4), # C major arpeggio
             (392.00, 0.2), (329.63, 0.2), (261.63, 0.4),
             (293.66, 0.2), (349.23, 0.2), (440.00, 0.2), (587.33, 0.4), # D minor
             (440.00, 0.2), (349.23, 0.2), (293.66, 0.4)
         ]
-        self.bgm_index = 0
-        self.bgm_timer = 0
+        self.bgm_channel = None
         self.is_playing_bgm = True
 
     def init_sounds(self):
-        self.sounds['collect'] = generate_tone(880, 0.1, 0.3, 'sine')
-        self.sounds['hit'] = generate_tone(110, 0.3, 0.5, 'sawtooth')
-        self.sounds['gameover'] = generate_tone(55, 1.0, 0.6, 'square')
-        self.sounds['win'] = generate_tone(523.25, 0.5, 0.4, 'sine')
+        # Render (or load) the effects up front, so the first play does not stall
+        for args in self.effects.values():
+            self.bank.tone(*args)
+        # The whole BGM sequence as one looping buffer, on a channel the effects cannot take
+        self.bgm = self.bank.sequence(self.bgm_notes, 0.1, 'sine')
+        pygame.mixer.set_reserved(1)
+        self.bgm_channel = pygame.mixer.Channel(0)
 
     def play(self, name):
-        if name in self.sounds:
-            self.sounds[name].play()
+        if name in self.effects:
+            self.bank.tone(*self.effects[name]).play()
             
     def update_bgm(self):
         if not self.is_playing_bgm: return
         
-        self.bgm_timer -= 1
-        if self.bgm_timer <= 0:
-            freq, duration = self.bgm_notes[self.bgm_index]
-            sound = generate_tone(freq, duration, 0.1, 'sine')
-            sound.play()
-            
-            self.bgm_timer = int(duration * FPS)
-            self.bgm_index = (self.bgm_index + 1) % len(self.bgm_notes)
+        # Only (re)starts the pre-rendered loop; nothing is synthesized per frame
+        if not self.bgm_channel.get_busy():
+            self.bgm_channel.play(self.bgm, loops=-1)
+
+    def stop_bgm(self):
+        self.is_playing_bgm = False
+        if self.bgm_channel is not None:
+            self.bgm_channel.stop()
+
+    def close(self):
+        # Prune on the way out, once every sound this run asked for is marked used
+        self.stop_bgm()
+        self.bank.cache.prune()
 
 # --- Game Objects ---
 class Player(pygame.sprite.Sprite):
@@ -109,6 +345,7 @@ class Player(pygame.sprite.Sprite):
         pygame.draw.line(self.image, BLACK, (5, 20), (15, 40), 1)
         pygame.draw.line(self.image, BLACK, (35, 20), (25, 40), 1)
         
+        self.mask = pygame.mask.from_surface(self.image)
         self.rect = self.image.get_rect()
         self.rect.centerx = SCREEN_WIDTH // 2
         self.rect.top = 100
@@ -124,35 +361,179 @@ class Player(pygame.sprite.Sprite):
         if self.rect.left < 0: self.rect.left = 0
         if self.rect.right > SCREEN_WIDTH: self.rect.right = SCREEN_WIDTH
 
+OBJECT_POINTS = {'candy': 100, 'umbrella': 100, 'meteor': -100}
+
+def draw_object(obj_type):
+    """The 40x40 picture of an object type"""
+    image = pygame.Surface((40, 40), pygame.SRCALPHA)
+    if obj_type == 'candy':
+        pygame.draw.circle(image, (255, 105, 180), (20, 20), 15) # Pink Candy
+    elif obj_type == 'umbrella':
+         # Red Umbrella
+        pygame.draw.arc(image, (255, 0, 0), (5, 10, 30, 20), 0, math.pi, 3)
+        pygame.draw.line(image, BLACK, (20, 10), (20, 35), 2)
+        pygame.draw.arc(image, BLACK, (15, 30, 10, 10), math.pi, 0, 2)
+    elif obj_type == 'meteor':
+        pygame.draw.circle(image, (100, 100, 100), (20, 20), 18) # Gray rock
+        pygame.draw.circle(image, (50, 50, 50), (15, 15), 5)
+    return image
+
 class GameObject(pygame.sprite.Sprite):
-    def __init__(self, obj_type):
+    # obj_type -> (image, mask), drawn once and shared by every instance
+    art = {}
+
+    def __init__(self, obj_type, pool=None):
         super().__init__()
+        self.pool = pool
+        self.rect = pygame.Rect(0, 0, 40, 40)
+        self.reset(obj_type)
+
+    def reset(self, obj_type):
+        """Become a new object of obj_type just below the screen"""
         self.type = obj_type
-        self.image = pygame.Surface((40, 40), pygame.SRCALPHA)
-        
-        if self.type == 'candy':
-            pygame.draw.circle(self.image, (255, 105, 180), (20, 20), 15) # Pink Candy
-            self.points = 100
-        elif self.type == 'umbrella':
-             # Red Umbrella
-            pygame.draw.arc(self.image, (255, 0, 0), (5, 10, 30, 20), 0, math.pi, 3)
-            pygame.draw.line(self.image, BLACK, (20, 10), (20, 35), 2)
-            pygame.draw.arc(self.image, BLACK, (15, 30, 10, 10), math.pi, 0, 2)
-            self.points = 100
-        elif self.type == 'meteor':
-            pygame.draw.circle(self.image, (100, 100, 100), (20, 20), 18) # Gray rock
-            pygame.draw.circle(self.image, (50, 50, 50), (15, 15), 5)
-            self.points = -100
-            
-        self.rect = self.image.get_rect()
+        if obj_type not in GameObject.art:
+            image = draw_object(obj_type)
+            GameObject.art[obj_type] = (image, pygame.mask.from_surface(image))
+        self.image, self.mask = GameObject.art[obj_type]
+        self.points = OBJECT_POINTS[obj_type]
+        self.rect.size = self.image.get_size()
         self.rect.x = random.randint(0, SCREEN_WIDTH - self.rect.width)
         self.rect.y = SCREEN_HEIGHT + 20 # Start below screen
+
+    def kill(self):
+        # Back to the pool once it has left every group (off screen or collected)
+        was_alive = self.alive()
+        super().kill()
+        if was_alive and self.pool is not None:
+            self.pool.release(self)
         
     def update(self):
         self.rect.y -= SCROLL_SPEED
         # Kill if off top
         if self.rect.bottom < 0:
             self.kill()
+            return
+        for group in self.groups():
+            if isinstance(group, SpatialGroup):
+                group.relocate(self)
+
+class ObjectPool:
+    """
+    Recycles GameObjects. A killed object goes back on the free list and
+    spawn() resets and reuses it, so once the pool is warm spawning allocates
+    no sprites, rects or surfaces and draws nothing.
+    """
+    def __init__(self, prefill=0):
+        self.free = [GameObject('candy', pool=self) for _ in range(prefill)]
+
+    def spawn(self, obj_type, *groups):
+        if self.free:
+            obj = self.free.pop()
+            obj.reset(obj_type)
+        else:
+            obj = GameObject(obj_type, pool=self)
+        obj.add(*groups)
+        return obj
+
+    def release(self, obj):
+        self.free.append(obj)
+
+# --- Collision ---
+class SpatialGroup(pygame.sprite.Group):
+    """
+    Sprite group with a uniform grid broad phase.
+
+    Every sprite is listed in the cell_size x cell_size buckets its rect
+    overlaps. A sprite calls relocate() after moving (GameObject.update does);
+    the buckets only change when the rect crosses into other cells. Queries
+    look at the buckets around a rect instead of the whole group and confirm
+    hits with a rect test, like pygame.sprite.spritecollide. Pass
+    collided=pygame.sprite.collide_mask for a pixel test on top of it (sprites
+    should carry a .mask, or collide_mask builds one per test).
+    """
+    def __init__(self, *sprites, cell_size=64):
+        self.cell_size = cell_size
+        self.buckets = {}  # (cx, cy) -> set of sprites
+        self.cells = {}    # sprite -> (cx0, cy0, cx1, cy1)
+        super().__init__(*sprites)
+
+    def _cell_range(self, rect):
+        c = self.cell_size
+        return rect.left // c, rect.top // c, (rect.right - 1) // c, (rect.bottom - 1) // c
+
+    def _link(self, sprite, cells):
+        cx0, cy0, cx1, cy1 = cells
+        for cx in range(cx0, cx1 + 1):
+            for cy in range(cy0, cy1 + 1):
+                self.buckets.setdefault((cx, cy), set()).add(sprite)
+
+    def _unlink(self, sprite, cells):
+        cx0, cy0, cx1, cy1 = cells
+        for cx in range(cx0, cx1 + 1):
+            for cy in range(cy0, cy1 + 1):
+                bucket = self.buckets[(cx, cy)]
+                bucket.discard(sprite)
+                if not bucket:
+                    del self.buckets[(cx, cy)]
+
+    def add_internal(self, sprite, layer=None):
+        super().add_internal(sprite)
+        cells = self._cell_range(sprite.rect)
+        self.cells[sprite] = cells
+        self._link(sprite, cells)
+
+    def remove_internal(self, sprite):
+        super().remove_internal(sprite)
+        self._unlink(sprite, self.cells.pop(sprite))
+
+    def relocate(self, sprite):
+        """Update the buckets of a sprite whose rect has moved"""
+        old = self.cells.get(sprite)
+        cells = self._cell_range(sprite.rect)
+        if old is None or cells == old:
+            return
+        self._unlink(sprite, old)
+        self._link(sprite, cells)
+        self.cells[sprite] = cells
+
+    def candidates(self, rect):
+        """Sprites in the buckets overlapping rect (a superset of the hits)"""
+        cx0, cy0, cx1, cy1 = self._cell_range(rect)
+        found = set()
+        for cx in range(cx0, cx1 + 1):
+            for cy in range(cy0, cy1 + 1):
+                bucket = self.buckets.get((cx, cy))
+                if bucket:
+                    found |= bucket
+        return found
+
+    def spritecollide(self, sprite, dokill=False, collided=None):
+        """pygame.sprite.spritecollide against this group, checking nearby sprites only"""
+        hits = [other for other in self.candidates(sprite.rect)
+                if other is not sprite and sprite.rect.colliderect(other.rect)
+                and (collided is None or collided(sprite, other))]
+        if dokill:
+            for other in hits:
+                other.kill()
+        return hits
+
+    def collide_pairs(self, collided=None):
+        """Every colliding (a, b) pair of sprites in the group, once"""
+        seen = set()
+        pairs = []
+        for bucket in self.buckets.values():
+            if len(bucket) < 2:
+                continue
+            members = list(bucket)
+            for i, a in enumerate(members):
+                for b in members[i + 1:]:
+                    key = (id(a), id(b)) if id(a) < id(b) else (id(b), id(a))
+                    if key in seen:
+                        continue
+                    seen.add(key)
+                    if a.rect.colliderect(b.rect) and (collided is None or collided(a, b)):
+                        pairs.append((a, b))
+        return pairs
 
 # --- Main Game ---
 def main():
@@ -175,7 +556,9 @@ def main():
     # Sprites
     player = Player()
     all_sprites = pygame.sprite.Group(player)
-    objects = pygame.sprite.Group()
+    objects = SpatialGroup()
+    # Objects live about (SCREEN_HEIGHT + 60) / SCROLL_SPEED frames, one spawns every SPAWN_INTERVAL
+    pool = ObjectPool(prefill=(SCREEN_HEIGHT + 60) // SCROLL_SPEED // SPAWN_INTERVAL + 2)
     
     # Variables
     score = 0
@@ -198,16 +581,14 @@ def main():
             # Spawn Objects
             if frames_elapsed % SPAWN_INTERVAL == 0:
                 obj_type = random.choice(['candy', 'candy', 'umbrella', 'meteor', 'meteor'])
-                obj = GameObject(obj_type)
-                objects.add(obj)
-                all_sprites.add(obj)
+                pool.spawn(obj_type, objects, all_sprites)
             
             # Updates
             all_sprites.update()
             audio.update_bgm()
             
-            # Collisions
-            hits = pygame.sprite.spritecollide(player, objects, True)
+            # Collisions: grid broad phase, then rect and mask tests
+            hits = objects.spritecollide(player, True, pygame.sprite.collide_mask)
             for hit in hits:
                 score += hit.points
                 if hit.points > 0:
@@ -218,13 +599,13 @@ def main():
             # Game Over Check
             if score < 0:
                 game_state = 'gameover'
-                audio.is_playing_bgm = False
+                audio.stop_bgm()
                 audio.play('gameover')
             
             # Win Check
             if frames_elapsed >= max_frames:
                 game_state = 'win'
-                audio.is_playing_bgm = False
+                audio.stop_bgm()
                 audio.play('win')
                 
         # Drawing
@@ -261,6 +642,7 @@ def main():
         pygame.display.flip()
         clock.tick(FPS)
 
+    audio.close()
     pygame.quit()
 
 if __name__ == "__main__":
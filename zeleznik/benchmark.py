@@ -0,0 +1,308 @@
+"""
+Benchmark suite for the Zeleznik model implementations.
+
+For every implementation it measures
+  - single-point latency  (one -mu2(r)/RT evaluation, best-of-N median per call)
+  - grid throughput       (points/sec on the standard grid sizes)
+  - peak memory           (tracemalloc peak of one grid run, separate from timing)
+  - accuracy              (against the Table 7 reference points used by verify_table_7)
+and writes everything to a JSON report, so runs can be compared across releases.
+
+Usage (from the repository root):
+    python -m zeleznik.benchmark                        # all implementations -> benchmark_report.json
+    python -m zeleznik.benchmark -o new.json --impl core_model2 model2
+    python -m zeleznik.benchmark --compare old.json     # non-zero exit on a regression
+
+The scalar classes loop in Python, so grids larger than their max_points are
+recorded as skipped instead of taking minutes.
+"""
+
+import argparse
+import importlib
+import json
+import math
+import platform
+import statistics
+import sys
+import time
+import tracemalloc
+from datetime import datetime, timezone
+
+import numpy as np
+
+from zeleznik.zeleznik_core import ZeleznikCore, wt_to_mole_fraction
+
+# Table 7 (-mu2(r)/RT) reference points, as embedded in the verify_table_7 functions
+# (zeleznik_model2 / zeleznik_core at 298.15 K, zeleznik_model3 at 350 K)
+TABLE7_REFERENCE = [
+    (298.15, 0.10, 0.4931),
+    (298.15, 0.20, 1.5753),
+    (298.15, 0.30, 3.0816),
+    (298.15, 0.40, 4.8016),
+    (298.15, 0.50, 6.8584),
+    (298.15, 0.60, 8.6533),
+    (298.15, 0.70, 10.0160),
+    (298.15, 0.80, 11.1347),
+    (298.15, 0.90, 12.2345),
+    (298.15, 0.98, 15.2470),
+    (350.0, 0.10, 0.5387),
+    (350.0, 0.50, 5.7337),
+    (350.0, 0.90, 10.7424),
+]
+
+# name: (temperature points, wt% points) over 0-75 degC x 50-99.9 wt%
+GRID_SIZES = {
+    'small': (16, 100),
+    'medium': (76, 500),
+    'large': (751, 5000),
+}
+
+SINGLE_POINT = (298.15, 0.5)
+
+
+class Implementation:
+    """
+    Adapter giving every model the same two entry points:
+      point(x1, T)      -> float
+      grid(x1, T)       -> array (n_T, n_x1) for x1 of shape (n_x1,) and T of shape (n_T,)
+    """
+
+    def __init__(self, name, point, grid, max_points=None, description=''):
+        self.name = name
+        self.point = point
+        self.grid = grid
+        self.max_points = max_points
+        self.description = description
+
+
+def _scalar_grid(point):
+    def grid(x1, T):
+        return np.array([[point(x, t) for x in x1] for t in T])
+    return grid
+
+
+def _scalar_implementation(name, module, cls, method='calc_minus_mu2_r_over_RT', description=''):
+    model = getattr(importlib.import_module(f'zeleznik.{module}'), cls)()
+    point = getattr(model, method)
+    return Implementation(name, point, _scalar_grid(point), max_points=50_000,
+                          description=description or f'{module}.{cls}.{method}')
+
+
+def _core_implementation(variant):
+    model = ZeleznikCore(variant)
+
+    def point(x1, T):
+        return float(model.calc_minus_mu2_r_over_RT(x1, T))
+
+    def grid(x1, T):
+        return model.calc_minus_mu2_r_over_RT(x1[None, :], T[:, None])
+
+    return Implementation(f'core_{variant}', point, grid, description=f'zeleznik_core.ZeleznikCore({variant!r})')
+
+
+def _sulfuric_latm_implementation():
+    mod = importlib.import_module('zeleznik.硫酸の水活量計算')
+
+    def point(x1, T):
+        return float(mod.calc_minus_mu_RT(np.atleast_1d(float(x1)), T)[0])
+
+    def grid(x1, T):
+        # The script evaluates one temperature row at a time
+        return np.array([mod.calc_minus_mu_RT(x1, t) for t in T])
+
+    return Implementation('sulfuric_latm', point, grid, description='硫酸の水活量計算.calc_minus_mu_RT')
+
+
+IMPLEMENTATIONS = {
+    'model': lambda: _scalar_implementation('model', 'zeleznik_model', 'ZeleznikModel'),
+    'model2': lambda: _scalar_implementation('model2', 'zeleznik_model2', 'ZeleznikModel2'),
+    'model3': lambda: _scalar_implementation('model3', 'zeleznik_model3', 'ZeleznikModel3'),
+    'final': lambda: _scalar_implementation('final', 'zeleznik_final', 'ZeleznikFinal', method='calc_prop'),
+    'core_model2': lambda: _core_implementation('model2'),
+    'core_final': lambda: _core_implementation('final'),
+    'sulfuric_latm': _sulfuric_latm_implementation,
+}
+
+
+def grid_inputs(size):
+    n_t, n_wt = GRID_SIZES[size]
+    T = np.linspace(0.0, 75.0, n_t) + 273.15
+    x1 = wt_to_mole_fraction(np.linspace(50.0, 99.9, n_wt))
+    return x1, T
+
+
+def bench_single_point(impl, repeat=5, min_time=0.05):
+    """Median over `repeat` runs of the per-call time (seconds)"""
+    T, x1 = SINGLE_POINT
+    impl.point(x1, T)  # warm-up (imports, caches)
+
+    # Calibrate the loop count so one run takes about min_time
+    n = 1
+    while True:
+        t0 = time.perf_counter()
+        for _ in range(n):
+            impl.point(x1, T)
+        elapsed = time.perf_counter() - t0
+        if elapsed >= min_time or n >= 1_000_000:
+            break
+        n *= 10
+
+    runs = []
+    for _ in range(repeat):
+        t0 = time.perf_counter()
+        for _ in range(n):
+            impl.point(x1, T)
+        runs.append((time.perf_counter() - t0) / n)
+    return {'median_s': statistics.median(runs), 'min_s': min(runs), 'calls_per_run': n}
+
+
+def bench_grid(impl, size, repeat=3):
+    x1, T = grid_inputs(size)
+    points = len(x1) * len(T)
+    if impl.max_points is not None and points > impl.max_points:
+        return {'points': points, 'skipped': True}
+
+    runs = []
+    for _ in range(repeat):
+        t0 = time.perf_counter()
+        impl.grid(x1, T)
+        runs.append(time.perf_counter() - t0)
+
+    # Peak memory in a separate run: tracemalloc slows allocation-heavy code down
+    tracemalloc.start()
+    impl.grid(x1, T)
+    _, peak = tracemalloc.get_traced_memory()
+    tracemalloc.stop()
+
+    best = min(runs)
+    return {
+        'points': points,
+        'seconds': best,
+        'points_per_sec': points / best if best > 0 else None,
+        'peak_memory_bytes': peak,
+    }
+
+
+def bench_accuracy(impl):
+    errors = []
+    points = []
+    for T, x1, ref in TABLE7_REFERENCE:
+        calc = float(impl.point(x1, T))
+        errors.append(calc - ref)
+        points.append({'T': T, 'x1': x1, 'ref': ref, 'calc': calc})
+    errors = np.array(errors)
+    finite = np.isfinite(errors)
+    return {
+        'max_abs_error': float(np.max(np.abs(errors[finite]))) if finite.any() else None,
+        'rms_error': float(math.sqrt(np.mean(errors[finite] ** 2))) if finite.any() else None,
+        'n_nonfinite': int(np.count_nonzero(~finite)),
+        'points': points,
+    }
+
+
+def run_benchmarks(names=None, sizes=None, repeat=3, progress=True):
+    names = list(names or IMPLEMENTATIONS)
+    sizes = list(sizes or GRID_SIZES)
+
+    report = {
+        'meta': {
+            'timestamp': datetime.now(timezone.utc).isoformat(timespec='seconds'),
+            'python': platform.python_version(),
+            'numpy': np.__version__,
+            'platform': platform.platform(),
+            'machine': platform.machine(),
+            'grid_sizes': {s: list(GRID_SIZES[s]) for s in sizes},
+        },
+        'results': {},
+    }
+
+    for name in names:
+        if progress:
+            print(f"Benchmarking {name} ...")
+        impl = IMPLEMENTATIONS[name]()
+        result = {
+            'description': impl.description,
+            'single_point': bench_single_point(impl, repeat=max(repeat, 3)),
+            'grid': {},
+            'accuracy': bench_accuracy(impl),
+        }
+        for size in sizes:
+            result['grid'][size] = bench_grid(impl, size, repeat=repeat)
+        report['results'][name] = result
+
+    return report
+
+
+def print_summary(report):
+    print(f"{'Implementation':<16} {'1-point (us)':>14} {'Table 7 RMS':>12}  " +
+          "  ".join(f"{s + ' (pts/s)':>18}" for s in report['meta']['grid_sizes']))
+    for name, r in report['results'].items():
+        cells = []
+        for g in r['grid'].values():
+            cells.append(f"{'skipped':>18}" if g.get('skipped') else f"{g['points_per_sec']:>18.4g}")
+        rms = r['accuracy']['rms_error']
+        rms = f"{rms:>12.4f}" if rms is not None else f"{'--':>12}"
+        print(f"{name:<16} {r['single_point']['median_s'] * 1e6:>14.2f} {rms}  " + "  ".join(cells))
+
+
+def compare_reports(old, new, tolerance=0.25, accuracy_tolerance=1e-6):
+    """
+    List regressions of `new` against `old`: slower single-point or grid runs
+    (by more than `tolerance`, relative) and any change in Table 7 error.
+    """
+    regressions = []
+    for name, r_new in new['results'].items():
+        r_old = old['results'].get(name)
+        if r_old is None:
+            continue
+
+        t_old = r_old['single_point']['median_s']
+        t_new = r_new['single_point']['median_s']
+        if t_new > t_old * (1 + tolerance):
+            regressions.append(f"{name}: single point {t_old * 1e6:.2f} -> {t_new * 1e6:.2f} us")
+
+        for size, g_new in r_new['grid'].items():
+            g_old = r_old['grid'].get(size)
+            if not g_old or g_old.get('skipped') or g_new.get('skipped'):
+                continue
+            if g_new['points_per_sec'] < g_old['points_per_sec'] / (1 + tolerance):
+                regressions.append(f"{name}: {size} grid {g_old['points_per_sec']:.4g} -> "
+                                   f"{g_new['points_per_sec']:.4g} points/s")
+
+        e_old = r_old['accuracy']['max_abs_error']
+        e_new = r_new['accuracy']['max_abs_error']
+        if e_old is not None and (e_new is None or abs(e_new - e_old) > accuracy_tolerance):
+            regressions.append(f"{name}: Table 7 max error {e_old:.6f} -> {e_new}")
+    return regressions
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description=__doc__.split('\n\n')[0].strip())
+    parser.add_argument('-o', '--output', default='benchmark_report.json')
+    parser.add_argument('--impl', nargs='+', choices=list(IMPLEMENTATIONS), help='implementations to run (default: all)')
+    parser.add_argument('--sizes', nargs='+', choices=list(GRID_SIZES), help='grid sizes to run (default: all)')
+    parser.add_argument('--repeat', type=int, default=3)
+    parser.add_argument('--compare', metavar='OLD_REPORT', help='fail if slower or less accurate than this report')
+    parser.add_argument('--tolerance', type=float, default=0.25, help='allowed relative slowdown for --compare')
+    args = parser.parse_args(argv)
+
+    report = run_benchmarks(args.impl, args.sizes, repeat=args.repeat)
+    with open(args.output, 'w', encoding='utf-8') as f:
+        json.dump(report, f, indent=2, ensure_ascii=False)
+    print_summary(report)
+    print(f"Report saved to {args.output}")
+
+    if args.compare:
+        with open(args.compare, encoding='utf-8') as f:
+            old = json.load(f)
+        regressions = compare_reports(old, report, tolerance=args.tolerance)
+        for line in regressions:
+            print(f"REGRESSION {line}")
+        if regressions:
+            return 1
+        print(f"No regressions against {args.compare}")
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -62,20 +62,33 @@ class ZeleznikModel:
             S[i] = S_i
         return S[1], S[2]
 
-    def calc_val(self, x1, T):
-        h = 1e-5
-        if x1 < h:
-            x_plus, x_minus, denom = x1 + h, x1, h
-        elif x1 > 1.0 - h:
-            x_plus, x_minus, denom = x1, x1 - h, h
-        else:
-            x_plus, x_minus, denom = x1 + h, x1 - h, 2*h
-            
-        Q_plus = self.calc_Q(x_plus, T)
-        Q_minus = self.calc_Q(x_minus, T)
-        dQ = (Q_plus - Q_minus) / denom
-        Q = self.calc_Q(x1, T)
+    def calc_Q_and_dQ(self, x1, T):
+        """
+        Q and dQ/dx1 in a single pass (same Phi logic as calc_Q: Phi(1)=1, Phi(2)=0).
+        With dx_j/dx1 = s_j (s_1 = +1, s_2 = -1):
+        d/dx1 [(mu + eps*ln x_j) x_j x_k] = eps*s_j*x_k + (mu + eps*ln x_j)*(s_j*x_k + x_j*s_k)
+        """
+        # see ZeleznikModel2.calc_minus_Ge_over_RT_and_derivative
+        x1 = min(max(x1, 1e-12), 1.0 - 1e-12)
+        x = {1: x1, 2: 1.0 - x1}
+        s = {1: 1.0, 2: -1.0}
+        phi = {1: 1.0, 2: 0.0}
         
+        Q = 0.0
+        dQ = 0.0
+        for i in [1, 2]:
+            for j in [1, 2]:
+                for k in [1, 2]:
+                    mu = self.get_val(self.mu_coeffs, j, k, i, T)
+                    eps = self.get_val(self.eps_coeffs, j, k, i, T)
+                    coef = mu + eps * math.log(x[j])
+                    Q += phi[i] * coef * x[j] * x[k]
+                    # x_j * d(ln x_j)/dx1 = s_j
+                    dQ += phi[i] * (eps * s[j] * x[k] + coef * (s[j] * x[k] + x[j] * s[k]))
+        return Q, dQ
+
+    def calc_val(self, x1, T):
+        Q, dQ = self.calc_Q_and_dQ(x1, T)
         return Q - x1 * dQ
 
 def verify():
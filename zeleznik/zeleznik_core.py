@@ -0,0 +1,403 @@
+"""
+Zeleznik Model - Vectorized NumPy Core
+Evaluates Equation 12 on whole arrays of (x1, T) instead of one point at a time.
+
+-G^(e)/RT = Sum_i Phi(i) * Sum_j Sum_k (mu_jki + eps_jki * ln(x_m)) * x_j * x_k
+
+The Table 6 coefficients are stored once (TABLE6). The hypotheses explored in
+the other zeleznik_*.py scripts only differ in the Phi(i) definition and in the
+log index m (j, k or i); each one is a Variant in VARIANTS. The default
+('model2') is the optimal empirical fit of ZeleznikModel2:
+  Phi(1) = 1, Phi(2) = 0
+  Log term uses ln(x_j)
+
+Inputs broadcast against each other, so a temperature column of shape (n_T, 1)
+and a concentration row of shape (n_x,) give the full (n_T, n_x) grid in a
+handful of array operations. The temperature dependent parameters are only
+evaluated on the shape of T, not on the full grid.
+
+Species:
+  1 = H2SO4 (Sulfuric Acid)
+  2 = H2O (Water)
+"""
+
+import math
+import numpy as np
+
+# Coefficients from Table 6 (page 28)
+# Basis: [a0, a1, a2, a3, a4] for 1, T, T^2, 1/T, ln(T)
+# Axes: [param (0=mu, 1=eps), j-1, k-1, i-1, basis]
+# 112 and 222 are not in the table and stay 0.
+TABLE6 = np.zeros((2, 2, 2, 2, 5))
+
+_MU = {
+    '111': [-0.235245033870E+02, 0.406889449841E-01, -0.151369362907E-04, 0.296144445015E+04, 0.492476973663E+00],
+    '121': [0.111458541077E+04, -0.118330789360E+01, -0.209946114412E-02, -0.246749842271E+06, 0.341234558134E+02],
+    '221': [-0.801488100747E+02, -0.116246143257E-01, 0.606767928954E-05, 0.309272150882E+04, 0.127601667471E+02],
+    '122': [0.888711613784E+03, -0.250531359687E+01, 0.605638824061E-03, -0.196983296431E+06, 0.745500643380E+02],
+}
+# Apply symmetry: mu_jki = mu_kji
+_MU['211'] = _MU['121']
+_MU['212'] = _MU['122']
+
+_EPS = {
+    '111': [0.288731663295E+04, -0.332602457749E+01, -0.282047283300E-02, -0.528216112353E+06, 0.686997435643E+00],
+    '121': [-0.370944593249E+03, -0.690310834523E+00, 0.563455068422E-03, -0.382252997064E+04, 0.942682037574E+02],
+    '211': [0.383025318809E+02, -0.295997878789E-01, 0.120999746782E-04, -0.324697498999E+04, -0.383566039532E+01],
+    '221': [0.232476399402E+04, -0.141626921317E+00, -0.626760562881E-02, -0.430390687961E+06, -0.612339472744E+02],
+    '122': [-0.163385547832E+04, -0.335344369968E+01, 0.710978119903E-02, 0.198200003569E+06, 0.246693619189E+03],
+    '212': [0.127375159848E+04, 0.103333898148E+01, 0.341400487633E-02, 0.195290667051E+06, -0.431737442782E+03],
+}
+
+for _p, _db in enumerate([_MU, _EPS]):
+    for _key, _c in _db.items():
+        _j, _k, _i = (int(ch) - 1 for ch in _key)
+        TABLE6[_p, _j, _k, _i] = _c
+
+
+# Molar masses used by the CSV generators (g/mol)
+M_H2SO4 = 98.079
+M_H2O = 18.01528
+
+
+def wt_to_mole_fraction(wt_h2so4):
+    """Weight percent H2SO4 -> mole fraction x1, elementwise (same arithmetic as the CSV scripts)."""
+    w1 = np.asarray(wt_h2so4, dtype=float)
+    n1 = w1 / M_H2SO4
+    n2 = (100.0 - w1) / M_H2O
+    total = n1 + n2
+    return np.where(total == 0, 0.0, n1 / np.where(total == 0, 1.0, total))
+
+
+def mole_fraction_to_wt(x1):
+    """Mole fraction x1 -> weight percent H2SO4, elementwise."""
+    x1 = np.asarray(x1, dtype=float)
+    m1 = x1 * M_H2SO4
+    return 100.0 * m1 / (m1 + (1.0 - x1) * M_H2O)
+
+
+def safe_ln(x):
+    """Elementwise ln(x), clamped to -115 (approx ln(1e-50)) like the scalar models."""
+    x = np.asarray(x, dtype=float)
+    return np.where(x > 1e-50, np.log(np.maximum(x, 1e-50)), -115.0)
+
+
+# =============================================================================
+# Phi(i) definitions
+# Each returns ((Phi(1), Phi(2)), (dPhi(1)/dx1, dPhi(2)/dx1), (d2Phi(1)/dx1^2, d2Phi(2)/dx1^2))
+# with x2 = 1 - x1.
+# =============================================================================
+def _phi_best_fit(x1, x2):
+    return (1.0, 0.0), (0.0, 0.0), (0.0, 0.0)
+
+def _phi_a(x1, x2):
+    # Phi1 = x1*x2, Phi2 = x1*x2*(x1-x2)
+    p, d = x1 * x2, x1 - x2
+    return (p, p * d), (x2 - x1, 2*p - d*d), (-2.0, -6*d)
+
+def _phi_b(x1, x2):
+    # Phi1 = 1, Phi2 = x1/x2 (0 where x2 vanishes, like ZeleznikModel4)
+    ok = x2 > 1e-10
+    x2_safe = np.where(ok, x2, 1.0)
+    return ((1.0, np.where(ok, x1 / x2_safe, 0.0)),
+            (0.0, np.where(ok, 1.0 / x2_safe**2, 0.0)),
+            (0.0, np.where(ok, 2.0 / x2_safe**3, 0.0)))
+
+def _phi_c(x1, x2):
+    # Phi1 = 1, Phi2 = x1*x2
+    return (1.0, x1 * x2), (0.0, x2 - x1), (0.0, -2.0)
+
+def _phi_d(x1, x2):
+    # Phi1 = 1, Phi2 = x1*x2*(x1-x2)
+    p, d = x1 * x2, x1 - x2
+    return (1.0, p * d), (0.0, 2*p - d*d), (0.0, -6*d)
+
+def _phi_d_flip(x1, x2):
+    # Phi1 = 1, Phi2 = x1*x2*(x2-x1)
+    p, d = x1 * x2, x1 - x2
+    return (1.0, -p * d), (0.0, d*d - 2*p), (0.0, 6*d)
+
+
+class PhiMode:
+    """One Phi(i) hypothesis. `zero` lists the i for which Phi(i) is identically 0."""
+
+    def __init__(self, name, func, zero=()):
+        self.name = name
+        self.func = func
+        self.zero = frozenset(zero)
+
+    def __call__(self, x1, x2):
+        return self.func(x1, x2)
+
+
+# Names follow the phi_mode switch of ZeleznikModel4.calc_Q_term
+PHI_MODES = {
+    'best_fit': PhiMode('best_fit', _phi_best_fit, zero=(2,)),
+    'A': PhiMode('A', _phi_a),
+    'B': PhiMode('B', _phi_b),
+    'C': PhiMode('C', _phi_c),
+    'D': PhiMode('D', _phi_d),
+    'D_flip': PhiMode('D_flip', _phi_d_flip),
+}
+
+
+class Variant:
+    """
+    One Eq. 12 hypothesis: Phi(i) mode, log index ('j', 'k' or 'i'), and how Q is
+    turned into -mu2(r)/RT (optional -ln(x2) ideal term, overall sign).
+
+    The (i, j, k) loop is compiled once into a tuple of active terms: sums with
+    Phi(i) == 0 and index triples without Table 6 entries (112, 222) are dropped.
+    """
+
+    def __init__(self, name, phi_mode, log_index, ideal_term=False, sign=1.0, description=''):
+        if log_index not in ('j', 'k', 'i'):
+            raise ValueError(f"log_index must be 'j', 'k' or 'i', got {log_index!r}")
+        self.name = name
+        self.phi = PHI_MODES[phi_mode] if isinstance(phi_mode, str) else phi_mode
+        self.log_index = log_index
+        self.ideal_term = ideal_term
+        self.sign = sign
+        self.description = description
+        self.terms = self._compile()
+
+    def _compile(self):
+        terms = []
+        for i in range(2):
+            if i + 1 in self.phi.zero:
+                continue
+            for j in range(2):
+                for k in range(2):
+                    if not TABLE6[:, j, k, i].any():
+                        continue
+                    m = {'j': j, 'k': k, 'i': i}[self.log_index]
+                    terms.append((i, j, k, m))
+        return tuple(terms)
+
+    def __repr__(self):
+        return f"Variant({self.name!r}, phi={self.phi.name!r}, log={self.log_index!r})"
+
+
+VARIANTS = {
+    'model2': Variant('model2', 'best_fit', 'j',
+                      description='zeleznik_model2.py, zeleznik_model3.py, solve.py'),
+    'model': Variant('model', 'C', 'j', sign=-1.0,
+                     description='zeleznik_model.py (sign flipped against Table 7)'),
+    'script7': Variant('script7', 'B', 'j',
+                       description='硫酸の水活量計算7.py'),
+    'final': Variant('final', 'D', 'k', ideal_term=True,
+                     description='zeleznik_final.py'),
+    'final_flip': Variant('final_flip', 'D_flip', 'k', ideal_term=True,
+                          description='zeleznik_final.py with flip_phi2=True'),
+    'debug': Variant('debug', 'C', 'i',
+                     description='debug_zeleznik.py (Q only)'),
+}
+
+
+def get_variant(variant):
+    """Accept a Variant or a VARIANTS key"""
+    if isinstance(variant, Variant):
+        return variant
+    try:
+        return VARIANTS[variant]
+    except KeyError:
+        raise ValueError(f"Unknown variant {variant!r}, expected one of {sorted(VARIANTS)}") from None
+
+
+class ZeleznikCore:
+    def __init__(self, variant='model2'):
+        self.coeffs = TABLE6
+        self.variant = get_variant(variant)
+
+    def calc_params(self, T):
+        """
+        Evaluate every mu_jki / eps_jki at temperature(s) T.
+        Returns an array of shape T.shape + (2, 2, 2, 2) indexed [..., param, j, k, i].
+        """
+        T = np.asarray(T, dtype=float)[..., None, None, None, None]
+        c = self.coeffs
+        return c[..., 0] + c[..., 1]*T + c[..., 2]*T**2 + c[..., 3]/T + c[..., 4]*np.log(T)
+
+    def _Q_from_params(self, x1, p, order=0):
+        """
+        Q and, up to `order`, its x1-derivatives from precomputed parameters p.
+        Returns Q for order 0, (Q, dQ) for order 1 and (Q, dQ, d2Q) for order 2.
+
+        Per term, with P = x_j*x_k, L = ln(x_m), dx_j/dx1 = s_j (s_1 = +1, s_2 = -1):
+          P' = s_j*x_k + x_j*s_k,  P'' = 2*s_j*s_k
+          L' = s_m/x_m,            L'' = -1/x_m^2
+          d/dx1  [(mu + eps*L) P] = eps*L'*P + (mu + eps*L)*P'
+          d2/dx1 [(mu + eps*L) P] = eps*(L''*P + 2*L'*P') + (mu + eps*L)*P''
+        For m = j or m = k the 1/x_m of L'*P cancels, so only the ln(x_i) variants
+        need a guard in the first derivative. ln(x_m) itself is unbounded, so for
+        derivatives x1 is kept just inside (0, 1): x1 = 0 or 1 then continues its
+        neighbours instead of multiplying the clamped log by a finite slope.
+        """
+        if order >= 1:
+            x1 = np.clip(x1, 1e-12, 1.0 - 1e-12)
+        x2 = 1.0 - x1
+        x = (x1, x2)
+        s = (1.0, -1.0)
+        ln_x = (safe_ln(x1), safe_ln(x2))
+        if order >= 2:
+            inv_x = tuple(np.where(xm > 1e-50, 1.0 / np.where(xm > 1e-50, xm, 1.0), 0.0) for xm in x)
+        terms = self.variant.terms
+
+        S = [0.0, 0.0]
+        dS = [0.0, 0.0]
+        d2S = [0.0, 0.0]
+        for i, j, k, m in terms:
+            mu = p[..., 0, j, k, i]
+            eps = p[..., 1, j, k, i]
+            coef = mu + eps * ln_x[m]
+            S[i] = S[i] + coef * x[j] * x[k]
+            if order >= 1:
+                if m == j:
+                    dlog = s[j] * x[k]
+                elif m == k:
+                    dlog = s[k] * x[j]
+                else:
+                    x_m = np.where(x[m] > 1e-50, x[m], 1.0)
+                    dlog = np.where(x[m] > 1e-50, s[m] * x[j] * x[k] / x_m, 0.0)
+                dP = s[j] * x[k] + x[j] * s[k]
+                dS[i] = dS[i] + eps * dlog + coef * dP
+            if order >= 2:
+                P = x[j] * x[k]
+                d2log = -inv_x[m] * inv_x[m] * P + 2 * s[m] * inv_x[m] * dP
+                d2S[i] = d2S[i] + eps * d2log + coef * (2 * s[j] * s[k])
+
+        phi, dphi, d2phi = self.variant.phi(x1, x2)
+        active = sorted({t[0] for t in terms})
+        Q = 0.0
+        dQ = 0.0
+        d2Q = 0.0
+        for i in active:
+            Q = Q + phi[i] * S[i]
+            if order >= 1:
+                dQ = dQ + dphi[i] * S[i] + phi[i] * dS[i]
+            if order >= 2:
+                d2Q = d2Q + d2phi[i] * S[i] + 2 * dphi[i] * dS[i] + phi[i] * d2S[i]
+        if order == 0:
+            return Q
+        if order == 1:
+            return Q, dQ
+        return Q, dQ, d2Q
+
+    def _minus_mu2_from_params(self, x1, p, with_slope=False):
+        """
+        -mu_2^(r)/RT = Q - x1 * dQ/dx1, plus the variant's ideal term and sign.
+        With with_slope, also returns its x1-derivative: -x1 * d2Q/dx1^2 (+ 1/x2).
+        """
+        if with_slope:
+            Q, dQ, d2Q = self._Q_from_params(x1, p, order=2)
+        else:
+            Q, dQ = self._Q_from_params(x1, p, order=1)
+        val = Q - x1 * dQ
+        if self.variant.ideal_term:
+            val = val - safe_ln(1.0 - x1)
+        if self.variant.sign < 0:
+            val = -val
+        if not with_slope:
+            return val
+
+        slope = -x1 * d2Q
+        if self.variant.ideal_term:
+            x2 = 1.0 - x1
+            slope = slope + np.where(x2 > 1e-50, 1.0 / np.where(x2 > 1e-50, x2, 1.0), 0.0)
+        if self.variant.sign < 0:
+            slope = -slope
+        return val, slope
+
+    def calc_minus_Ge_over_RT(self, x1, T):
+        """Q = -G^(e)/RT from Eq. 12 for broadcastable arrays x1 and T."""
+        x1 = np.asarray(x1, dtype=float)
+        return self._Q_from_params(x1, self.calc_params(T))
+
+    def calc_minus_Ge_over_RT_and_derivative(self, x1, T):
+        """(Q, dQ/dx1) in a single pass, dQ/dx1 in closed form."""
+        x1 = np.asarray(x1, dtype=float)
+        return self._Q_from_params(x1, self.calc_params(T), order=1)
+
+    def calc_minus_mu2_r_over_RT(self, x1, T):
+        """-mu_2^(r)/RT for broadcastable arrays x1 and T (see _minus_mu2_from_params)."""
+        x1 = np.asarray(x1, dtype=float)
+        return self._minus_mu2_from_params(x1, self.calc_params(T))
+
+    def calc_minus_mu2_r_over_RT_and_slope(self, x1, T):
+        """(-mu_2^(r)/RT, its derivative with respect to x1), both in closed form."""
+        x1 = np.asarray(x1, dtype=float)
+        return self._minus_mu2_from_params(x1, self.calc_params(T), with_slope=True)
+
+    def calc_batch(self, x1, T):
+        """
+        Returns (-mu2(r)/RT, water activity) as arrays of the broadcast shape of x1 and T.
+        Water activity: ln(a_w) = mu2(r)/RT.
+        """
+        minus_mu2 = self.calc_minus_mu2_r_over_RT(x1, T)
+        return minus_mu2, np.exp(-minus_mu2)
+
+    def at_temperature(self, T):
+        """
+        Fix the temperature and evaluate the ten Table 6 parameters once.
+        The returned object only does the x-dependent work per call.
+        """
+        return ZeleznikCoreAtT(self, T)
+
+
+class ZeleznikCoreAtT:
+    """ZeleznikCore with mu_jki / eps_jki precomputed for one temperature (or a T array)."""
+
+    def __init__(self, model, T):
+        self.model = model
+        self.T = T
+        self.params = model.calc_params(T)
+
+    def calc_minus_Ge_over_RT(self, x1):
+        return self.model._Q_from_params(np.asarray(x1, dtype=float), self.params)
+
+    def calc_minus_Ge_over_RT_and_derivative(self, x1):
+        return self.model._Q_from_params(np.asarray(x1, dtype=float), self.params, order=1)
+
+    def calc_minus_mu2_r_over_RT(self, x1):
+        return self.model._minus_mu2_from_params(np.asarray(x1, dtype=float), self.params)
+
+    def calc_batch(self, x1):
+        minus_mu2 = self.calc_minus_mu2_r_over_RT(x1)
+        return minus_mu2, np.exp(-minus_mu2)
+
+
+def verify_table_7(variant='model2'):
+    """Verify against Table 7 data at T=298.15K (same points as zeleznik_model2)"""
+    model = ZeleznikCore(variant)
+    T = 298.15
+
+    table7_data = np.array([
+        (0.1000, 0.4931),
+        (0.2000, 1.5753),
+        (0.3000, 3.0816),
+        (0.4000, 4.8016),
+        (0.5000, 6.8584),
+        (0.6000, 8.6533),
+        (0.7000, 10.0160),
+        (0.8000, 11.1347),
+        (0.9000, 12.2345),
+        (0.9800, 15.2470),
+    ])
+    x1, ref = table7_data[:, 0], table7_data[:, 1]
+
+    calc, a_w = model.calc_batch(x1, T)
+    diff = calc - ref
+
+    print(f"=== Zeleznik Core ({model.variant.name}) Verification at T = {T} K ===")
+    print(f"{'x1':<10} {'Calculated':<12} {'Table 7':<12} {'Diff':<12} {'a_w':<10}")
+    print("-" * 56)
+    for row in zip(x1, calc, ref, diff, a_w):
+        print(f"{row[0]:<10.4f} {row[1]:<12.4f} {row[2]:<12.4f} {row[3]:<+12.4f} {row[4]:<10.4g}")
+
+    rms = math.sqrt(np.mean(diff**2))
+    print("-" * 56)
+    print(f"RMS Error: {rms:.4f}")
+
+if __name__ == "__main__":
+    import sys
+    verify_table_7(sys.argv[1] if len(sys.argv) > 1 else 'model2')
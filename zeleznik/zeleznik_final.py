@@ -66,24 +66,64 @@ class ZeleznikFinal:
             
         return total_Q
 
+    def calc_Q_term_and_derivative(self, x_species, T, flip_phi2=False):
+        """
+        Q and dQ/dx1 in one pass (x2 = 1 - x1, so dx_j/dx1 = s_j with s_1 = +1, s_2 = -1).
+        
+        dPhi(2)/dx1 = 2*x1*x2 - (x1-x2)^2 (negated if flip_phi2)
+        d/dx1 [(mu + eps*ln x_k) x_j x_k] = eps*s_k*x_j + (mu + eps*ln x_k)*(s_j*x_k + x_j*s_k)
+        """
+        x = x_species
+        s = {1: 1.0, 2: -1.0}
+        
+        phi2 = x[1]*x[2]*(x[1]-x[2])
+        dphi2 = 2*x[1]*x[2] - (x[1]-x[2])**2
+        if flip_phi2:
+            phi2 = -phi2
+            dphi2 = -dphi2
+            
+        phi = {1: 1.0, 2: phi2}
+        dphi = {1: 0.0, 2: dphi2}
+
+        ln_x = {}
+        for idx in [1, 2]:
+            ln_x[idx] = math.log(x[idx]) if x[idx] > 1e-100 else -230.0
+
+        total_Q = 0.0
+        total_dQ = 0.0
+        
+        for i in [1, 2]:
+            # Phi(2) vanishes at x1=0.5 but its slope does not, so only skip when both are zero
+            if abs(phi[i]) < 1e-20 and abs(dphi[i]) < 1e-20: continue
+            
+            inner_sum = 0.0
+            d_inner_sum = 0.0
+            for j in [1, 2]:
+                for k in [1, 2]:
+                    key = f"{j}{k}{i}"
+                    mu = self._get_val(self.mu_db, key, T)
+                    eps = self._get_val(self.eps_db, key, T)
+                    
+                    # LOG INDEX is k (confirmed)
+                    coef = mu + eps * ln_x[k]
+
+                    inner_sum += coef * x[j] * x[k]
+                    d_inner_sum += eps * s[k] * x[j] + coef * (s[j] * x[k] + x[j] * s[k])
+            
+            total_Q += phi[i] * inner_sum
+            total_dQ += dphi[i] * inner_sum + phi[i] * d_inner_sum
+            
+        return total_Q, total_dQ
+
     def calc_prop(self, x_acid, T, flip_phi2=False):
         # 1=Acid, 2=Water
         x1 = x_acid
         x2 = 1.0 - x1
-        x_species = {1: x1, 2: x2}
-        
-        h = 1e-7
-        Q = self.calc_Q_term(x_species, T, flip_phi2)
         
-        # dQ/dx1 (Acid)
-        if x1 > 0.5:
-             x1_m = x1 - h
-             Q_m = self.calc_Q_term({1: x1_m, 2: 1.0-x1_m}, T, flip_phi2)
-             dQdx1 = (Q - Q_m)/h
-        else:
-             x1_p = x1 + h
-             Q_p = self.calc_Q_term({1: x1_p, 2: 1.0-x1_p}, T, flip_phi2)
-             dQdx1 = (Q_p - Q)/h
+        # Q and dQ/dx1 (Acid), analytic; x1 kept inside (0, 1),
+        # see ZeleznikModel2.calc_minus_Ge_over_RT_and_derivative
+        x1_in = min(max(x1, 1e-12), 1.0 - 1e-12)
+        Q, dQdx1 = self.calc_Q_term_and_derivative({1: x1_in, 2: 1.0 - x1_in}, T, flip_phi2)
              
         # Water Property (-mu2/RT)
         # = Q - x1 * dQdx1 - ln x2
@@ -0,0 +1,300 @@
+"""
+Chunked grid pipeline for the Zeleznik CSV generators.
+
+The (temperature x concentration) grid is computed one temperature slab at a
+time with the vectorized core and written out in bulk, so memory stays flat
+no matter how fine the grid step is and the per-row formatting cost is a
+single np.savetxt call per slab.
+
+Binary output: a grid directory holding one 2-D .npy per field (T axis x wt%
+axis, float64), the coordinate vectors as 1-D .npy files and a grid.json
+describing shapes, axes and the model variant. load_grid() memory-maps the
+fields, so reading one temperature row does not load the whole file and
+values keep full precision.
+"""
+
+import csv
+import json
+import multiprocessing
+import os
+import numpy as np
+
+from zeleznik.zeleznik_core import ZeleznikCore, wt_to_mole_fraction
+
+CSV_HEADER = ['Temperature_C', 'Temperature_K', 'Wt_H2SO4', 'MoleFraction_H2SO4', 'Minus_Mu2_r_over_RT']
+CSV_FORMAT = ['%.1f', '%.2f', '%.1f', '%.6f', '%.6f']
+
+
+def grid_axis(start, end, step):
+    """start + i*step for i = 0..n (integer steps, no floating point accumulation)"""
+    n_steps = int(round((end - start) / step))
+    return start + np.arange(n_steps + 1) * step
+
+
+def compute_slab(model, t_c, x1):
+    """-mu2(r)/RT for a slab of temperatures (degC), shape (len(t_c), len(x1))"""
+    t_k = t_c + 273.15
+    return model.calc_minus_mu2_r_over_RT(x1[None, :], t_k[:, None])
+
+
+def slab_bounds(n_rows, slab_rows):
+    """(row_start, row_end) of every slab; serial and parallel paths use the same split"""
+    return [(start, min(start + slab_rows, n_rows)) for start in range(0, n_rows, slab_rows)]
+
+
+def iter_slabs(model, t_c_axis, wt_axis, slab_rows=64):
+    """
+    Yield (row_start, t_c, x1, values) per temperature slab.
+    t_c has shape (rows,), x1 shape (n_wt,), values shape (rows, n_wt).
+    """
+    x1 = wt_to_mole_fraction(wt_axis)
+    for row_start, row_end in slab_bounds(len(t_c_axis), slab_rows):
+        t_c = t_c_axis[row_start:row_end]
+        yield row_start, t_c, x1, compute_slab(model, t_c, x1)
+
+
+def write_csv_chunked(output_file, t_c_axis, wt_axis, model=None, slab_rows=64, progress=True):
+    """
+    Write the long-format CSV (same columns and formatting as generate_csv in
+    zeleznik_model_csvout2.py) one temperature slab at a time.
+    """
+    if model is None:
+        model = ZeleznikCore()
+
+    n_wt = len(wt_axis)
+    total = len(t_c_axis) * n_wt
+    count = 0
+
+    with open(output_file, 'w', newline='') as f:
+        csv.writer(f).writerow(CSV_HEADER)
+
+        for row_start, t_c, x1, values in iter_slabs(model, t_c_axis, wt_axis, slab_rows):
+            rows = len(t_c)
+            block = np.empty((rows * n_wt, 5))
+            block[:, 0] = np.repeat(t_c, n_wt)
+            block[:, 1] = np.repeat(t_c + 273.15, n_wt)
+            block[:, 2] = np.tile(wt_axis, rows)
+            block[:, 3] = np.tile(x1, rows)
+            block[:, 4] = values.ravel()
+            np.savetxt(f, block, fmt=CSV_FORMAT, delimiter=',', newline='\r\n')
+
+            count += rows * n_wt
+            if progress:
+                print(f"Processed {count}/{total} points... ({count/total*100:.1f}%)")
+
+    return total
+
+
+GRID_META_FILE = 'grid.json'
+GRID_FORMAT = 'zeleznik-grid'
+GRID_VERSION = 1
+
+
+def variant_meta(model):
+    """Model description stored in grid.json"""
+    v = model.variant
+    return {
+        'variant': v.name,
+        'phi_mode': v.phi.name,
+        'log_index': v.log_index,
+        'ideal_term': v.ideal_term,
+        'sign': v.sign,
+        'description': v.description,
+    }
+
+
+class NpyGridWriter:
+    """
+    Writes a grid directory slab by slab. The field arrays are created up front
+    with np.lib.format.open_memmap, so only the slab being written is in memory.
+    grid.json is written on close(), which marks the grid as complete.
+    """
+
+    def __init__(self, output_dir, t_c_axis, wt_axis, fields, x1=None, meta=None):
+        self.output_dir = output_dir
+        self.t_c_axis = np.asarray(t_c_axis, dtype=float)
+        self.wt_axis = np.asarray(wt_axis, dtype=float)
+        self.x1 = wt_to_mole_fraction(self.wt_axis) if x1 is None else np.asarray(x1, dtype=float)
+        self.fields = list(fields)
+        self.meta = dict(meta or {})
+        self.shape = (len(self.t_c_axis), len(self.wt_axis))
+
+        os.makedirs(output_dir, exist_ok=True)
+        # Remove a stale marker first so a half-written grid is never mistaken for a complete one
+        meta_path = os.path.join(output_dir, GRID_META_FILE)
+        if os.path.exists(meta_path):
+            os.remove(meta_path)
+
+        self.arrays = {}
+        for name in self.fields:
+            path = os.path.join(output_dir, f"{name}.npy")
+            self.arrays[name] = np.lib.format.open_memmap(path, mode='w+', dtype=np.float64, shape=self.shape)
+
+    def write_slab(self, row_start, values_by_field):
+        for name, values in values_by_field.items():
+            self.arrays[name][row_start:row_start + len(values)] = values
+
+    def close(self):
+        for arr in self.arrays.values():
+            arr.flush()
+        self.arrays = {}
+
+        axes = {
+            'temperature_c': self.t_c_axis,
+            'temperature_k': self.t_c_axis + 273.15,
+            'wt_h2so4': self.wt_axis,
+            'mole_fraction_h2so4': self.x1,
+        }
+        for name, values in axes.items():
+            np.save(os.path.join(self.output_dir, f"{name}.npy"), values)
+
+        meta = {
+            'format': GRID_FORMAT,
+            'version': GRID_VERSION,
+            'shape': list(self.shape),
+            'dtype': 'float64',
+            'row_axis': 'temperature_c',
+            'column_axis': 'wt_h2so4',
+            'axes': {name: f"{name}.npy" for name in axes},
+            'fields': {name: f"{name}.npy" for name in self.fields},
+            'model': self.meta,
+        }
+        with open(os.path.join(self.output_dir, GRID_META_FILE), 'w', encoding='utf-8') as f:
+            json.dump(meta, f, indent=2, ensure_ascii=False)
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, exc_type, exc, tb):
+        if exc_type is None:
+            self.close()
+
+
+GRID_FIELDS = ('minus_mu2_r_over_RT', 'water_activity')
+
+
+def _slab_fields(values):
+    return {
+        'minus_mu2_r_over_RT': values,
+        'water_activity': np.exp(-values),
+    }
+
+
+def write_npy_chunked(output_dir, t_c_axis, wt_axis, model=None, slab_rows=64, progress=True):
+    """Binary counterpart of write_csv_chunked: -mu2(r)/RT and water activity as T x wt% arrays."""
+    if model is None:
+        model = ZeleznikCore()
+
+    total = len(t_c_axis) * len(wt_axis)
+    count = 0
+    fields = list(GRID_FIELDS)
+
+    with NpyGridWriter(output_dir, t_c_axis, wt_axis, fields, meta=variant_meta(model)) as writer:
+        for row_start, t_c, x1, values in iter_slabs(model, t_c_axis, wt_axis, slab_rows):
+            writer.write_slab(row_start, _slab_fields(values))
+
+            count += values.size
+            if progress:
+                print(f"Processed {count}/{total} points... ({count/total*100:.1f}%)")
+
+    return total
+
+
+# =============================================================================
+# Parallel grid generation
+# Workers map the field files created by the parent (mode r+) and each writes
+# its own temperature slabs; nothing but slab bounds and counts is pickled.
+# =============================================================================
+_worker = {}
+
+
+def _init_worker(output_dir, model, t_c_axis, wt_axis):
+    _worker['model'] = model
+    _worker['t_c_axis'] = t_c_axis
+    _worker['x1'] = wt_to_mole_fraction(wt_axis)
+    _worker['arrays'] = {name: np.load(os.path.join(output_dir, f"{name}.npy"), mmap_mode='r+')
+                         for name in GRID_FIELDS}
+
+
+def _run_slab(bounds):
+    row_start, row_end = bounds
+    t_c = _worker['t_c_axis'][row_start:row_end]
+    values = compute_slab(_worker['model'], t_c, _worker['x1'])
+    for name, field in _slab_fields(values).items():
+        arr = _worker['arrays'][name]
+        arr[row_start:row_end] = field
+        arr.flush()
+    return values.size
+
+
+def write_npy_parallel(output_dir, t_c_axis, wt_axis, model=None, slab_rows=64, processes=None, progress=True):
+    """
+    write_npy_chunked across a process pool. The temperature axis is split into
+    the same slabs as the serial path, so the result is bit-identical to it.
+    """
+    if model is None:
+        model = ZeleznikCore()
+    t_c_axis = np.asarray(t_c_axis, dtype=float)
+    wt_axis = np.asarray(wt_axis, dtype=float)
+
+    total = len(t_c_axis) * len(wt_axis)
+    count = 0
+    bounds = slab_bounds(len(t_c_axis), slab_rows)
+
+    with NpyGridWriter(output_dir, t_c_axis, wt_axis, GRID_FIELDS, meta=variant_meta(model)) as writer:
+        # Make sure the .npy headers are on disk before the workers map the files
+        for arr in writer.arrays.values():
+            arr.flush()
+
+        with multiprocessing.Pool(processes, initializer=_init_worker,
+                                  initargs=(output_dir, model, t_c_axis, wt_axis)) as pool:
+            for n in pool.imap_unordered(_run_slab, bounds):
+                count += n
+                if progress:
+                    print(f"Processed {count}/{total} points... ({count/total*100:.1f}%)")
+
+    return total
+
+
+class GridData:
+    """A loaded grid directory. Fields are memory-mapped (read-only by default)."""
+
+    def __init__(self, path, meta, axes, fields):
+        self.path = path
+        self.meta = meta
+        self.axes = axes
+        self.fields = fields
+
+    @property
+    def temperature_c(self):
+        return self.axes['temperature_c']
+
+    @property
+    def wt_h2so4(self):
+        return self.axes['wt_h2so4']
+
+    def __getitem__(self, field):
+        return self.fields[field]
+
+    def row_index(self, t_c):
+        """Index of the temperature row closest to t_c (degC)"""
+        return int(np.argmin(np.abs(self.temperature_c - t_c)))
+
+    def row(self, field, t_c):
+        """One temperature row of a field; only that row is read from disk"""
+        return np.array(self.fields[field][self.row_index(t_c)])
+
+
+def load_grid(path, mmap_mode='r'):
+    meta_path = os.path.join(path, GRID_META_FILE)
+    if not os.path.exists(meta_path):
+        raise FileNotFoundError(f"{meta_path} not found (missing or incomplete grid)")
+    with open(meta_path, encoding='utf-8') as f:
+        meta = json.load(f)
+    if meta.get('format') != GRID_FORMAT:
+        raise ValueError(f"{path} is not a {GRID_FORMAT} directory")
+
+    axes = {name: np.load(os.path.join(path, fname)) for name, fname in meta['axes'].items()}
+    fields = {name: np.load(os.path.join(path, fname), mmap_mode=mmap_mode)
+              for name, fname in meta['fields'].items()}
+    return GridData(path, meta, axes, fields)
@@ -0,0 +1,141 @@
+"""
+Inverse Zeleznik model: H2SO4 concentration from a target water activity.
+
+Given T and a target water activity a_w (equilibrium relative humidity / 100),
+solve  -mu2(r)/RT (x1, T) = -ln(a_w)  for x1 (or wt%), for whole arrays of
+(T, a_w) at once.
+
+Method: bracketed (safeguarded) Newton. Every element keeps a bracket [a, b]
+with a sign change; the Newton step uses the analytic slope from
+ZeleznikCore.calc_minus_mu2_r_over_RT_and_slope and falls back to bisection
+whenever it would leave the bracket. Elements stop updating once converged.
+
+Failure flags are per element: no sign change over the bracket (target out of
+range for this T), invalid input (a_w <= 0 or NaN) or maxiter reached. Failed
+elements have x1 = NaN; the residual of the last iterate is still reported
+where the bracket was usable. Note that -mu2(r)/RT is not monotonic over the
+whole composition range for every variant; with several roots inside the
+bracket one of them is returned.
+"""
+
+import numpy as np
+
+from zeleznik.zeleznik_core import ZeleznikCore, wt_to_mole_fraction, mole_fraction_to_wt
+
+
+class InverseResult:
+    """Per-element solution of the inverse problem (all arrays of the broadcast shape)."""
+
+    def __init__(self, x1, converged, iterations, residual):
+        self.x1 = x1
+        self.converged = converged
+        self.iterations = iterations
+        self.residual = residual
+
+    @property
+    def wt(self):
+        return mole_fraction_to_wt(self.x1)
+
+    @property
+    def failed(self):
+        return ~self.converged
+
+    def __repr__(self):
+        n_ok = int(np.count_nonzero(self.converged))
+        return f"InverseResult({n_ok}/{self.converged.size} converged)"
+
+
+def solve_x1(T, a_w, model=None, x1_bracket=(1e-6, 1.0 - 1e-6), xtol=1e-12, ftol=1e-10, maxiter=100):
+    """
+    Solve for the mole fraction x1 with water activity a_w at temperature T (K).
+
+    T, a_w      broadcastable arrays
+    x1_bracket  (lo, hi) search interval, scalars or arrays broadcastable to the result
+    xtol        converged when the bracket (or the Newton step) is below xtol * max(1, |x1|)
+    ftol        converged when |-mu2(r)/RT - target| <= ftol
+    """
+    if model is None:
+        model = ZeleznikCore()
+
+    T, a_w = np.broadcast_arrays(np.asarray(T, dtype=float), np.asarray(a_w, dtype=float))
+    shape = T.shape
+    p = model.calc_params(T)
+
+    valid = np.isfinite(a_w) & (a_w > 0) & np.isfinite(T)
+    target = -np.log(np.where(valid, a_w, 1.0))
+
+    def residual(x):
+        val, slope = model._minus_mu2_from_params(x, p, with_slope=True)
+        return val - target, slope
+
+    a = np.broadcast_to(np.asarray(x1_bracket[0], dtype=float), shape).copy()
+    b = np.broadcast_to(np.asarray(x1_bracket[1], dtype=float), shape).copy()
+    fa, _ = residual(a)
+    fb, _ = residual(b)
+
+    # A usable bracket needs a sign change (or an endpoint that already hits the target)
+    valid &= np.isfinite(fa) & np.isfinite(fb) & (np.sign(fa) * np.sign(fb) <= 0)
+
+    x = np.where(fa == 0, a, np.where(fb == 0, b, 0.5 * (a + b)))
+    converged = valid & ((fa == 0) | (fb == 0))
+    active = valid & ~converged
+    iterations = np.zeros(shape, dtype=int)
+    f = np.full(shape, np.nan)
+
+    for _ in range(maxiter):
+        if not active.any():
+            break
+        f_new, slope = residual(x)
+        f = np.where(active, f_new, f)
+        iterations += active
+
+        # Shrink the bracket towards x
+        same_as_a = np.sign(f) == np.sign(fa)
+        a = np.where(active & same_as_a, x, a)
+        fa = np.where(active & same_as_a, f, fa)
+        b = np.where(active & ~same_as_a, x, b)
+        fb = np.where(active & ~same_as_a, f, fb)
+
+        # Newton step, bisection where it fails or leaves the bracket
+        with np.errstate(divide='ignore', invalid='ignore'):
+            x_newton = x - f / slope
+        lo, hi = np.minimum(a, b), np.maximum(a, b)
+        use_newton = np.isfinite(x_newton) & (x_newton > lo) & (x_newton < hi)
+        x_next = np.where(use_newton, x_newton, 0.5 * (a + b))
+
+        scale = np.maximum(1.0, np.abs(x))
+        done = (np.abs(f) <= ftol) | (np.abs(hi - lo) <= xtol * scale) | (np.abs(x_next - x) <= xtol * scale)
+        newly_done = active & done
+        converged |= newly_done
+        # Take the final step only where it was a Newton step; f at x is what we report
+        x = np.where(active & ~done, x_next, x)
+        active &= ~done
+
+    f_final, _ = residual(x)
+    x = np.where(converged, x, np.nan)
+    return InverseResult(x, converged, iterations, np.where(valid, f_final, np.nan))
+
+
+def solve_wt(T, a_w, model=None, wt_bracket=(50.0, 99.9), **kwargs):
+    """solve_x1 with the bracket given in wt% H2SO4; read the answer from result.wt"""
+    x1_bracket = (wt_to_mole_fraction(wt_bracket[0]), wt_to_mole_fraction(wt_bracket[1]))
+    return solve_x1(T, a_w, model=model, x1_bracket=x1_bracket, **kwargs)
+
+
+def solve_wt_from_humidity(T, rh_percent, model=None, **kwargs):
+    """Equilibrium relative humidity (%) over the acid -> wt% H2SO4"""
+    return solve_wt(T, np.asarray(rh_percent, dtype=float) / 100.0, model=model, **kwargs)
+
+
+if __name__ == "__main__":
+    model = ZeleznikCore('final')
+    T = np.array([[253.15], [298.15], [348.15]])
+    rh = np.array([1.0, 5.0, 10.0, 20.0, 40.0])
+
+    res = solve_wt_from_humidity(T, rh, model=model)
+    print(f"Variant: {model.variant.name}")
+    print(f"{'T (K)':<10}" + "".join(f"{f'RH {r:g}%':>12}" for r in rh))
+    for row_T, row_wt, row_ok in zip(T[:, 0], res.wt, res.converged):
+        cells = "".join(f"{w:>12.3f}" if ok else f"{'--':>12}" for w, ok in zip(row_wt, row_ok))
+        print(f"{row_T:<10.2f}{cells}")
+    print(res, "max iterations:", res.iterations.max())
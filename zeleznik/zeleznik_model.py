@@ -1,8 +1,9 @@
 
 import math
+from functools import lru_cache
 
 class ZeleznikModel:
-    def __init__(self):
+    def __init__(self, param_cache_size=256):
         self.R = 8.314462618  # J/(mol K)
 
         # Coefficients from Table 6
@@ -27,8 +28,10 @@ class ZeleznikModel:
         }
         # Note: 112 and 222 missing, assumed 0.0
 
-    def _get_param_val(self, db, j, k, i, T):
-        key = f"{j}{k}{i}"
+        # Evaluated parameters per temperature, LRU-bounded (CSV rows share T)
+        self._params_at = lru_cache(maxsize=param_cache_size)(self._eval_params)
+
+    def _calc_param(self, db, key, T):
         if key not in db:
             return 0.0
         
@@ -41,12 +44,28 @@ class ZeleznikModel:
                c[4] * math.log(T))
         return val
 
+    def _eval_params(self, T):
+        """{(j, k, i): (mu_jki, eps_jki)} at temperature T for all 8 index combinations"""
+        params = {}
+        for i in [1, 2]:
+            for j in [1, 2]:
+                for k in [1, 2]:
+                    key = f"{j}{k}{i}"
+                    params[(j, k, i)] = (self._calc_param(self.mu_coeffs_db, key, T),
+                                         self._calc_param(self.eps_coeffs_db, key, T))
+        return params
+
+    def _get_param_val(self, db, j, k, i, T):
+        mu_val, eps_val = self._params_at(T)[(j, k, i)]
+        return mu_val if db is self.mu_coeffs_db else eps_val
+
     def calc_Q(self, x1, T):
         x = {1: x1, 2: 1.0 - x1}
         
         ln_x = {}
         for idx in [1, 2]:
             ln_x[idx] = math.log(x[idx]) if x[idx] > 0 else -1e9
+        params = self._params_at(T)
             
         # Determine Phi values
         # Hypothesis: Phi(1)=1, Phi(2)=x1*x2.
@@ -59,8 +78,7 @@ class ZeleznikModel:
             S_i = 0.0
             for j in [1, 2]:
                 for k in [1, 2]:
-                    mu_val = self._get_param_val(self.mu_coeffs_db, j, k, i, T)
-                    eps_val = self._get_param_val(self.eps_coeffs_db, j, k, i, T)
+                    mu_val, eps_val = params[(j, k, i)]
                     
                     # Uses ln_x[j]
                     term = (mu_val + eps_val * ln_x[j]) * x[j] * x[k]
@@ -70,20 +88,49 @@ class ZeleznikModel:
             
         return Q_total
 
-    def calc_minus_mu2_r_over_RT(self, x1, T):
-        h = 1e-6
-        if x1 < h:
-            x1_plus, x1_minus, denom = x1 + h, x1, h
-        elif x1 > 1.0 - h:
-            x1_plus, x1_minus, denom = x1, x1 - h, h
-        else:
-            x1_plus, x1_minus, denom = x1 + h, x1 - h, 2*h
+    def calc_Q_and_dQ(self, x1, T):
+        """
+        Q and dQ/dx1 in a single pass.
+        x2 = 1 - x1, so dx_j/dx1 = s_j (s_1 = +1, s_2 = -1) and d(x1*x2)/dx1 = x2 - x1.
+        d/dx1 [(mu + eps*ln x_j) x_j x_k] = eps*s_j*x_k + (mu + eps*ln x_j)*(s_j*x_k + x_j*s_k)
+        """
+        # see ZeleznikModel2.calc_minus_Ge_over_RT_and_derivative
+        x1 = min(max(x1, 1e-12), 1.0 - 1e-12)
+        x = {1: x1, 2: 1.0 - x1}
+        s = {1: 1.0, 2: -1.0}
+        
+        ln_x = {}
+        for idx in [1, 2]:
+            ln_x[idx] = math.log(x[idx]) if x[idx] > 0 else -1e9
+        params = self._params_at(T)
             
-        Q_plus = self.calc_Q(x1_plus, T)
-        Q_minus = self.calc_Q(x1_minus, T)
-        dQ_dx1 = (Q_plus - Q_minus) / denom
+        # Phi(1)=1, Phi(2)=x1*x2 and their slopes
+        phi = {1: 1.0, 2: x[1]*x[2]}
+        dphi = {1: 0.0, 2: x[2] - x[1]}
+
+        Q_total = 0.0
+        dQ_total = 0.0
         
-        Q_val = self.calc_Q(x1, T)
+        for i in [1, 2]:
+            S_i = 0.0
+            dS_i = 0.0
+            for j in [1, 2]:
+                for k in [1, 2]:
+                    mu_val, eps_val = params[(j, k, i)]
+                    
+                    # Uses ln_x[j]
+                    coef = mu_val + eps_val * ln_x[j]
+                    S_i += coef * x[j] * x[k]
+                    dS_i += eps_val * s[j] * x[k] + coef * (s[j] * x[k] + x[j] * s[k])
+            
+            Q_total += phi[i] * S_i
+            dQ_total += dphi[i] * S_i + phi[i] * dS_i
+            
+        return Q_total, dQ_total
+
+    def calc_minus_mu2_r_over_RT(self, x1, T):
+        # Analytic dQ/dx1 (see calc_Q_and_dQ) instead of a three-point difference
+        Q_val, dQ_dx1 = self.calc_Q_and_dQ(x1, T)
         val = Q_val - x1 * dQ_dx1
         
         # Sign Correction:
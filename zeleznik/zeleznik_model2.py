@@ -18,9 +18,10 @@ Species:
 """
 
 import math
+from functools import lru_cache
 
 class ZeleznikModel2:
-    def __init__(self):
+    def __init__(self, param_cache_size=256):
         # Coefficients from Table 6 (page 28)
         # Basis: [a0, a1, a2, a3, a4] for 1, T, T^2, 1/T, ln(T)
         # Index order: jki
@@ -46,24 +47,34 @@ class ZeleznikModel2:
             '212': [0.127375159848E+04, 0.103333898148E+01, 0.341400487633E-02, 0.195290667051E+06, -0.431737442782E+03],
         }
         # Note: 112 and 222 not in table, assumed 0
+        
+        # Parameter values per temperature (LRU, bounded). Grid generators hold T fixed
+        # for a whole concentration row, so each T is evaluated only once.
+        self._params_at = lru_cache(maxsize=param_cache_size)(self._eval_params)
     
     def _calc_param(self, coeffs, T):
         """Calculate parameter value at temperature T using basis [1, T, T^2, 1/T, ln(T)]"""
         return coeffs[0] + coeffs[1]*T + coeffs[2]*T**2 + coeffs[3]/T + coeffs[4]*math.log(T)
     
+    def _eval_params(self, T):
+        """{(j, k, i): (mu_jki, eps_jki)} at temperature T for all 8 index combinations"""
+        params = {}
+        for i in [1, 2]:
+            for j in [1, 2]:
+                for k in [1, 2]:
+                    key = f"{j}{k}{i}"
+                    mu = self._calc_param(self.mu[key], T) if key in self.mu else 0.0
+                    eps = self._calc_param(self.eps[key], T) if key in self.eps else 0.0
+                    params[(j, k, i)] = (mu, eps)
+        return params
+    
     def _get_mu(self, j, k, i, T):
         """Get mu_jki at temperature T"""
-        key = f"{j}{k}{i}"
-        if key not in self.mu:
-            return 0.0
-        return self._calc_param(self.mu[key], T)
+        return self._params_at(T)[(j, k, i)][0]
     
     def _get_eps(self, j, k, i, T):
         """Get eps_jki at temperature T"""
-        key = f"{j}{k}{i}"
-        if key not in self.eps:
-            return 0.0
-        return self._calc_param(self.eps[key], T)
+        return self._params_at(T)[(j, k, i)][1]
     
     def calc_minus_Ge_over_RT(self, x1, T):
         """
@@ -89,14 +100,14 @@ class ZeleznikModel2:
             return -115.0  # Approx log(1e-50)
         
         ln_x = {1: safe_ln(x1), 2: safe_ln(x2)}
+        params = self._params_at(T)
         
         result = 0.0
         for i in [1, 2]:
             S_i = 0.0
             for j in [1, 2]:
                 for k in [1, 2]:
-                    mu_jki = self._get_mu(j, k, i, T)
-                    eps_jki = self._get_eps(j, k, i, T)
+                    mu_jki, eps_jki = params[(j, k, i)]
                     
                     # Optimal empirical fit: ln(x_j)
                     term = (mu_jki + eps_jki * ln_x[j]) * x[j] * x[k]
@@ -106,6 +117,56 @@ class ZeleznikModel2:
         
         return result
     
+    def calc_minus_Ge_over_RT_and_derivative(self, x1, T):
+        """
+        Single pass over Equation 12 returning (Q, dQ/dx1) with Q = -G^(e)/RT.
+        
+        With x2 = 1 - x1, dx_j/dx1 = s_j (s_1 = +1, s_2 = -1) and d ln(x_j)/dx1 = s_j / x_j, so
+        d/dx1 [(mu + eps*ln x_j) * x_j * x_k]
+            = eps * s_j * x_k + (mu + eps*ln x_j) * (s_j * x_k + x_j * s_k)
+        The 1/x_j of the log derivative cancels against x_j, but ln(x_j) itself is
+        unbounded (d(x ln x)/dx diverges at x = 0), so x1 is kept just inside
+        (0, 1) and x1 = 0 or 1 continues its neighbours instead of hitting the
+        clamped log.
+        """
+        x1 = min(max(x1, 1e-12), 1.0 - 1e-12)
+        x2 = 1.0 - x1
+        x = {1: x1, 2: x2}
+        s = {1: 1.0, 2: -1.0}
+        
+        # Phi definitions - Optimal empirical fit: Phi(1)=1, Phi(2)=0 (both constant)
+        phi = {
+            1: 1.0,
+            2: 0.0
+        }
+        
+        # Safe log
+        def safe_ln(val):
+            if val > 1e-50:
+                return math.log(val)
+            return -115.0  # Approx log(1e-50)
+        
+        ln_x = {1: safe_ln(x1), 2: safe_ln(x2)}
+        params = self._params_at(T)
+        
+        Q = 0.0
+        dQ = 0.0
+        for i in [1, 2]:
+            S_i = 0.0
+            dS_i = 0.0
+            for j in [1, 2]:
+                for k in [1, 2]:
+                    mu_jki, eps_jki = params[(j, k, i)]
+                    
+                    coef = mu_jki + eps_jki * ln_x[j]
+                    S_i += coef * x[j] * x[k]
+                    dS_i += eps_jki * s[j] * x[k] + coef * (s[j] * x[k] + x[j] * s[k])
+            
+            Q += phi[i] * S_i
+            dQ += phi[i] * dS_i
+        
+        return Q, dQ
+    
     def calc_minus_mu2_r_over_RT(self, x1, T):
         """
         Calculate -mu_2^(r)/RT using partial molar property relation.
@@ -121,24 +182,10 @@ class ZeleznikModel2:
         Then: G^(e)/RT = -Q
         And: mu_2^(e)/RT = -Q - x1 * d(-Q)/dx1 = -Q + x1 * dQ/dx1
         So: -mu_2^(e)/RT = Q - x1 * dQ/dx1
+        
+        dQ/dx1 is analytic (see calc_minus_Ge_over_RT_and_derivative).
         """
-        h = 1e-7
-        
-        # Central difference for dQ/dx1
-        if x1 < h:
-            Q_plus = self.calc_minus_Ge_over_RT(x1 + h, T)
-            Q_here = self.calc_minus_Ge_over_RT(x1, T)
-            dQ = (Q_plus - Q_here) / h
-        elif x1 > 1.0 - h:
-            Q_here = self.calc_minus_Ge_over_RT(x1, T)
-            Q_minus = self.calc_minus_Ge_over_RT(x1 - h, T)
-            dQ = (Q_here - Q_minus) / h
-        else:
-            Q_plus = self.calc_minus_Ge_over_RT(x1 + h, T)
-            Q_minus = self.calc_minus_Ge_over_RT(x1 - h, T)
-            dQ = (Q_plus - Q_minus) / (2*h)
-        
-        Q = self.calc_minus_Ge_over_RT(x1, T)
+        Q, dQ = self.calc_minus_Ge_over_RT_and_derivative(x1, T)
         
         # -mu_2/RT = Q - x1 * dQ/dx1 (best so far: RMS 5.96)
         return Q - x1 * dQ
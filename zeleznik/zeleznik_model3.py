@@ -105,27 +105,50 @@ class ZeleznikModel3:
             total += phi[i] * S_i
         return total
 
+    def calc_excess_G_term_and_derivative(self, x1, T):
+        """
+        Q and dQ/dx1 in one pass (same configuration as calc_excess_G_term).
+        With dx_j/dx1 = s_j (s_1 = +1, s_2 = -1):
+        d/dx1 [(mu + eps*ln x_j) x_j x_k] = eps*s_j*x_k + (mu + eps*ln x_j)*(s_j*x_k + x_j*s_k)
+        """
+        # see ZeleznikModel2.calc_minus_Ge_over_RT_and_derivative
+        x1 = min(max(x1, 1e-12), 1.0 - 1e-12)
+        x2 = 1.0 - x1
+        x = {1: x1, 2: x2}
+        s = {1: 1.0, 2: -1.0}
+        
+        # Best Fit Configuration (constant Phi, so dPhi/dx1 = 0)
+        phi = {1: 1.0, 2: 0.0}
+
+        def safe_ln(v): return math.log(v) if v > 1e-50 else -115.0
+        ln_x = {1: safe_ln(x1), 2: safe_ln(x2)}
+        
+        total = 0.0
+        d_total = 0.0
+        for i in [1, 2]:
+            S_i = 0.0
+            dS_i = 0.0
+            if abs(phi[i]) < 1e-20: continue
+            
+            for j in [1, 2]:
+                for k in [1, 2]:
+                    mu_val = self._get_val(self.mu, j, k, i, T)
+                    eps_val = self._get_val(self.eps, j, k, i, T)
+                    
+                    coef = mu_val + eps_val * ln_x[j]
+                    S_i += coef * x[j] * x[k]
+                    dS_i += eps_val * s[j] * x[k] + coef * (s[j] * x[k] + x[j] * s[k])
+            total += phi[i] * S_i
+            d_total += phi[i] * dS_i
+        return total, d_total
+
     def _calc_raw_metric(self, x1, T):
         # Calculates Q - x1*dQ
         # Based on thermodynamic relation mu = G + (1-x) dG/dx ...
         # For relative partial molar G of component 2:
         # If Q ~ -G/RT, then result follows Q - x1dQ structure.
-        
-        h = 1e-7
-        if x1 < h:
-            Q_p = self.calc_excess_G_term(x1 + h, T)
-            Q_m = self.calc_excess_G_term(x1, T)
-            dQ = (Q_p - Q_m) / h
-        elif x1 > 1.0 - h:
-            Q_p = self.calc_excess_G_term(x1, T)
-            Q_m = self.calc_excess_G_term(x1 - h, T)
-            dQ = (Q_p - Q_m) / h 
-        else:
-            Q_p = self.calc_excess_G_term(x1 + h, T)
-            Q_m = self.calc_excess_G_term(x1 - h, T)
-            dQ = (Q_p - Q_m) / (2*h)
-            
-        Q = self.calc_excess_G_term(x1, T)
+        # dQ/dx1 is analytic, so one pass instead of three finite-difference evaluations.
+        Q, dQ = self.calc_excess_G_term_and_derivative(x1, T)
         return Q - x1 * dQ
 
     def calc_minus_mu2_r_over_RT(self, x1, T):
@@ -0,0 +1,199 @@
+"""
+Precomputed interpolation table for fast water-activity lookups.
+
+The table is built once from the vectorized model over the validity range
+(253.15-348.15 K, 50-99.9 wt%) and answers scalar or array queries with
+bicubic (tensor 4-point Lagrange) interpolation on a 4x4 node stencil, so a
+query costs the same no matter which model variant it was built from.
+
+Grid layout:
+  T axis:  uniform in T (K)
+  wt axis: uniform in ln(100 - wt). -mu2(r)/RT carries ln(x2) terms that get
+           steep towards 99.9 wt%; in this coordinate they are smooth, so the
+           nodes are dense where the function needs them.
+One extra node is evaluated from the model beyond each edge, so the stencil
+never has to extrapolate.
+
+max_error is measured against the exact model at build time (at the 0.2, 0.5
+and 0.8 fractions of every cell along both axes) and stored with the table.
+With the defaults (1 K x 400 nodes) it is below 1e-6 in -mu2(r)/RT for the
+model2 and final variants.
+"""
+
+import json
+import os
+import numpy as np
+
+from zeleznik.zeleznik_core import ZeleznikCore, wt_to_mole_fraction
+
+
+def _lagrange_weights(t):
+    """Cubic Lagrange weights for nodes at -1, 0, 1, 2 evaluated at t in [0, 1]"""
+    return (
+        -t * (t - 1) * (t - 2) / 6,
+        (t + 1) * (t - 1) * (t - 2) / 2,
+        -(t + 1) * t * (t - 2) / 2,
+        (t + 1) * t * (t - 1) / 6,
+    )
+
+
+# Parameters that shape the nodes; stored in meta and compared by load_or_build
+BUILD_DEFAULTS = {'t_range': (253.15, 348.15), 'wt_range': (50.0, 99.9), 't_step': 1.0, 'n_wt': 400}
+
+
+def _build_params(**build_kwargs):
+    params = dict(BUILD_DEFAULTS)
+    params.update((k, v) for k, v in build_kwargs.items() if k in BUILD_DEFAULTS)
+    # Plain floats/ints/lists, so they compare equal after a JSON round trip
+    return {
+        't_range': [float(x) for x in params['t_range']],
+        'wt_range': [float(x) for x in params['wt_range']],
+        't_step': float(params['t_step']),
+        'n_wt': int(params['n_wt']),
+    }
+
+
+def _npz_path(path):
+    """np.savez appends .npz to a path without it; load and exists() must see the same name"""
+    path = os.fspath(path)
+    return path if path.endswith('.npz') else path + '.npz'
+
+
+class ActivityTable:
+    def __init__(self, t_min, t_step, n_t, s_min, s_step, n_s, nodes, max_error=None, meta=None):
+        # nodes has shape (n_t + 2, n_s + 2): one ghost node on every side
+        self.t_min = float(t_min)
+        self.t_step = float(t_step)
+        self.n_t = int(n_t)
+        self.s_min = float(s_min)
+        self.s_step = float(s_step)
+        self.n_s = int(n_s)
+        self.nodes = np.asarray(nodes, dtype=float)
+        self.max_error = max_error
+        self.meta = dict(meta or {})
+
+    @property
+    def t_max(self):
+        return self.t_min + self.t_step * (self.n_t - 1)
+
+    @property
+    def wt_range(self):
+        s_max = self.s_min + self.s_step * (self.n_s - 1)
+        return 100.0 - np.exp(self.s_min), 100.0 - np.exp(s_max)
+
+    @classmethod
+    def build(cls, model=None, t_range=(253.15, 348.15), wt_range=(50.0, 99.9),
+              t_step=1.0, n_wt=400, check_error=True):
+        """Evaluate the model on the table nodes (plus ghost nodes)."""
+        if model is None:
+            model = ZeleznikCore()
+
+        t_min, t_max = t_range
+        requested_step = t_step
+        n_t = int(round((t_max - t_min) / t_step)) + 1
+        t_step = (t_max - t_min) / (n_t - 1)
+
+        s_min = np.log(100.0 - wt_range[0])
+        s_max = np.log(100.0 - wt_range[1])
+        s_step = (s_max - s_min) / (n_wt - 1)
+
+        t_nodes = t_min + t_step * np.arange(-1, n_t + 1)
+        wt_nodes = 100.0 - np.exp(s_min + s_step * np.arange(-1, n_wt + 1))
+        nodes = model.calc_minus_mu2_r_over_RT(wt_to_mole_fraction(wt_nodes)[None, :], t_nodes[:, None])
+
+        meta = {'variant': model.variant.name}
+        meta.update(_build_params(t_range=t_range, wt_range=wt_range, t_step=requested_step, n_wt=n_wt))
+        table = cls(t_min, t_step, n_t, s_min, s_step, n_wt, nodes, meta=meta)
+        if check_error:
+            table.max_error = table.measure_error(model)
+        return table
+
+    def measure_error(self, model, fractions=(0.2, 0.5, 0.8)):
+        """Max |table - model| of -mu2(r)/RT at the given fractions of every cell"""
+        f = np.asarray(fractions)
+        t = self.t_min + self.t_step * (np.arange(self.n_t - 1)[:, None] + f).ravel()
+        wt = 100.0 - np.exp(self.s_min + self.s_step * (np.arange(self.n_s - 1)[:, None] + f).ravel())
+        exact = model.calc_minus_mu2_r_over_RT(wt_to_mole_fraction(wt)[None, :], t[:, None])
+        approx = self.minus_mu2_r_over_RT(t[:, None], wt[None, :])
+        return float(np.max(np.abs(approx - exact)))
+
+    def minus_mu2_r_over_RT(self, T, wt):
+        """-mu2(r)/RT at temperature T (K) and wt% H2SO4, broadcasting like NumPy."""
+        T = np.asarray(T, dtype=float)
+        wt = np.asarray(wt, dtype=float)
+
+        w_lo, w_hi = self.wt_range
+        if np.any((T < self.t_min - 1e-9) | (T > self.t_max + 1e-9)):
+            raise ValueError(f"T outside table range {self.t_min}-{self.t_max} K")
+        if np.any((wt < w_lo - 1e-9) | (wt > w_hi + 1e-9)):
+            raise ValueError(f"wt% outside table range {w_lo:g}-{w_hi:g}")
+
+        fi = (T - self.t_min) / self.t_step
+        fj = (np.log(100.0 - wt) - self.s_min) / self.s_step
+        i = np.clip(np.floor(fi).astype(int), 0, self.n_t - 2)
+        j = np.clip(np.floor(fj).astype(int), 0, self.n_s - 2)
+        wu = _lagrange_weights(fi - i)
+        wv = _lagrange_weights(fj - j)
+
+        # nodes[i + a, j + b] is node (i - 1 + a, j - 1 + b) because of the ghost row/column
+        result = 0.0
+        for a in range(4):
+            row = 0.0
+            for b in range(4):
+                row = row + wv[b] * self.nodes[i + a, j + b]
+            result = result + wu[a] * row
+        return result
+
+    def water_activity(self, T, wt):
+        return np.exp(-self.minus_mu2_r_over_RT(T, wt))
+
+    def save(self, path):
+        np.savez(_npz_path(path), nodes=self.nodes,
+                 grid=np.array([self.t_min, self.t_step, self.n_t, self.s_min, self.s_step, self.n_s]),
+                 max_error=np.nan if self.max_error is None else self.max_error,
+                 meta=json.dumps(self.meta))
+
+    @classmethod
+    def load(cls, path):
+        with np.load(_npz_path(path)) as data:
+            t_min, t_step, n_t, s_min, s_step, n_s = data['grid']
+            max_error = float(data['max_error'])
+            table = cls(t_min, t_step, n_t, s_min, s_step, n_s, data['nodes'],
+                        max_error=None if np.isnan(max_error) else max_error,
+                        meta=json.loads(str(data['meta'])) if 'meta' in data else {'variant': str(data['variant'])})
+        return table
+
+    @classmethod
+    def load_or_build(cls, path, model=None, **build_kwargs):
+        """
+        Load a saved table built for the same variant and build parameters
+        (t_range, wt_range, t_step, n_wt), or build and save it once.
+        """
+        if model is None:
+            model = ZeleznikCore()
+        path = _npz_path(path)
+        if os.path.exists(path):
+            table = cls.load(path)
+            wanted = dict(_build_params(**build_kwargs), variant=model.variant.name)
+            if all(table.meta.get(k) == v for k, v in wanted.items()):
+                return table
+        table = cls.build(model, **build_kwargs)
+        table.save(path)
+        return table
+
+
+if __name__ == "__main__":
+    import sys
+    import time
+
+    variant = sys.argv[1] if len(sys.argv) > 1 else 'model2'
+    model = ZeleznikCore(variant)
+
+    t0 = time.perf_counter()
+    table = ActivityTable.build(model)
+    print(f"Built {variant} table {table.nodes.shape} in {time.perf_counter() - t0:.3f} s")
+    print(f"Max error vs model: {table.max_error:.3e}")
+
+    T, wt = 298.15, 70.0
+    exact = float(model.calc_minus_mu2_r_over_RT(wt_to_mole_fraction(wt), T))
+    print(f"T={T} K, {wt} wt%: table {float(table.minus_mu2_r_over_RT(T, wt)):.8f}, model {exact:.8f}")